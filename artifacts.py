@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# Typed intermediate artifacts shared by the pipeline scripts (one SQLite file
+# per category folder). scrape.py writes products and properties here; the
+# tab-separated SSMS exports (property ids, bvin/sku, images) are loaded once
+# and re-read from SQLite until the export file changes. Excel is only
+# produced as the final Hotcakes import.
+# ------------------------------------------------------------------------------
+
+ARTIFACT_FILE_NAME = "pipeline.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    slug         TEXT PRIMARY KEY,
+    sku          TEXT NOT NULL,
+    name         TEXT,
+    price        TEXT,
+    manufacturer TEXT,
+    image        TEXT,
+    description  TEXT
+);
+CREATE TABLE IF NOT EXISTS properties (
+    slug          TEXT NOT NULL,
+    position      INTEGER NOT NULL,
+    property_name TEXT NOT NULL,
+    value         TEXT,
+    PRIMARY KEY (slug, position)
+);
+CREATE INDEX IF NOT EXISTS properties_name ON properties (property_name);
+CREATE TABLE IF NOT EXISTS export_sources (
+    name     TEXT PRIMARY KEY,
+    path     TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+def artifact_path(folder):
+    return os.path.join(folder, ARTIFACT_FILE_NAME)
+
+
+class ArtifactStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    # --------------------------------------------------------------------------
+    # Written by scrape.py
+    # --------------------------------------------------------------------------
+    def write_product(self, slug, main_row, property_rows):
+        """
+        Stores one scraped product (replacing an earlier version of it).
+        property_rows are the property sheet rows; the slug is stored on every
+        row, so readers do not need to forward-fill it.
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO products (slug, sku, name, price, manufacturer, image, description) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    slug,
+                    main_row["SKU"],
+                    main_row["Name"],
+                    main_row["Price"],
+                    main_row["Manufacturer"],
+                    main_row["Image"],
+                    main_row["Description"],
+                ),
+            )
+            self.conn.execute("DELETE FROM properties WHERE slug = ?", (slug,))
+            self.conn.executemany(
+                "INSERT INTO properties (slug, position, property_name, value) VALUES (?, ?, ?, ?)",
+                [
+                    (slug, position, row["Property Name"], row["Value"])
+                    for position, row in enumerate(property_rows)
+                ],
+            )
+
+    # --------------------------------------------------------------------------
+    # Read by the generator scripts
+    # --------------------------------------------------------------------------
+    def properties(self, chunksize=None):
+        """Columns: 'product slug', 'property name', 'value' (same names as the property xlsx)."""
+        return pd.read_sql_query(
+            'SELECT slug AS "product slug", property_name AS "property name", value '
+            "FROM properties ORDER BY slug, position",
+            self.conn,
+            chunksize=chunksize,
+        )
+
+    def property_names(self):
+        """Distinct property names, sorted."""
+        return [name for (name,) in self.conn.execute(
+            "SELECT DISTINCT property_name FROM properties WHERE TRIM(property_name) <> '' "
+            "ORDER BY property_name"
+        )]
+
+    def load_export(self, name, tsv_path):
+        """
+        A tab-separated SSMS export as a DataFrame with stripped, lower-case
+        column names. It is parsed once and cached in the export_<name> table
+        until the file's size or mtime changes.
+        """
+        table = f"export_{name}"
+        st = os.stat(tsv_path)
+        cached = self.conn.execute(
+            "SELECT path, size, mtime_ns FROM export_sources WHERE name = ?", (name,)
+        ).fetchone()
+        if cached == (tsv_path, st.st_size, st.st_mtime_ns):
+            return pd.read_sql_query(f'SELECT * FROM "{table}"', self.conn)
+
+        df = pd.read_csv(tsv_path, sep="\t", encoding="utf-8-sig")
+        df.columns = df.columns.str.strip().str.lower()
+        with self.conn:
+            df.to_sql(table, self.conn, if_exists="replace", index=False)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO export_sources (name, path, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                (name, tsv_path, st.st_size, st.st_mtime_ns),
+            )
+        return df
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,170 @@
+import os
+import math
+from xml.sax.saxutils import quoteattr
+from sql_emitter import SqlRaw, NULL
+
+# ------------------------------------------------------------------------------
+# Bulk-load output for the large generator tables (property values and value
+# translations). Instead of INSERT text, rows go to a UTF-8 tab-delimited data
+# file with a matching XML format file, plus a small loader script that runs
+#
+#   INSERT INTO <table> WITH (TABLOCK) (<columns>)
+#   SELECT <columns> FROM OPENROWSET(BULK '<data file>', FORMATFILE = '<fmt>', ...)
+#
+# so SQL Server loads the whole file as one minimally logged bulk operation.
+# OPENROWSET is used instead of plain BULK INSERT because the files only carry
+# some of the table's columns (the identity/default columns are left out).
+# The data file path must be readable by the SQL Server service: copy the
+# files next to the database and set server_folder to that location.
+# ------------------------------------------------------------------------------
+
+FIELD_TERMINATOR = "\t"
+ROW_TERMINATOR = "\r\n"
+
+# xsi:type of the target column in the format file
+NVARCHAR = "SQLNVARCHAR"
+INT = "SQLINT"
+BIGINT = "SQLBIGINT"
+UNIQUEIDENTIFIER = "SQLUNIQUEID"
+
+
+def bulk_field(value):
+    """
+    Python value -> data file field. None/NaN become an empty field, which
+    OPENROWSET reads as NULL (so an empty string is also loaded as NULL).
+    Tabs and line breaks cannot be escaped in a bulk file and are replaced
+    with a space.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, SqlRaw):
+        if value == NULL:
+            return ""
+        raise ValueError(f"SQL expression {value!r} cannot be written to a bulk-load file")
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        return str(int(value)) if value.is_integer() else repr(value)
+    if hasattr(value, "item"):
+        # numpy scalars (pandas cells)
+        return bulk_field(value.item())
+    text = str(value)
+    if "\t" in text or "\n" in text or "\r" in text:
+        text = text.replace("\r\n", " ").replace("\t", " ").replace("\r", " ").replace("\n", " ")
+    return text
+
+
+def _escape_terminator(terminator):
+    return terminator.replace("\t", "\\t").replace("\r", "\\r").replace("\n", "\\n")
+
+
+def format_file_xml(columns):
+    """XML format file for [(column name, xsi type), ...] in data file order."""
+    lines = [
+        '<?xml version="1.0"?>',
+        '<BCPFORMAT xmlns="http://schemas.microsoft.com/sqlserver/2004/bulkload/format" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">',
+        " <RECORD>",
+    ]
+    for index, _ in enumerate(columns, start=1):
+        last = index == len(columns)
+        terminator = _escape_terminator(ROW_TERMINATOR if last else FIELD_TERMINATOR)
+        lines.append(f'  <FIELD ID="{index}" xsi:type="CharTerm" TERMINATOR="{terminator}"/>')
+    lines.append(" </RECORD>")
+    lines.append(" <ROW>")
+    for index, (name, sql_type) in enumerate(columns, start=1):
+        lines.append(f'  <COLUMN SOURCE="{index}" NAME={quoteattr(name)} xsi:type="{sql_type}"/>')
+    lines.append(" </ROW>")
+    lines.append("</BCPFORMAT>")
+    return "\n".join(lines) + "\n"
+
+
+def _sql_string(text):
+    return "N'" + text.replace("'", "''") + "'"
+
+
+class BulkLoadWriter:
+    """
+    Same interface as sql_emitter.SqlBatchWriter (write_row / close / with),
+    but writes <name>.tsv, <name>.fmt and <name>_load.sql into `folder`.
+
+    columns:       [(column name, xsi type), ...]
+    server_folder: the folder as seen by SQL Server (defaults to `folder`)
+    preamble / postamble: statements around the load (e.g. SET IDENTITY_INSERT)
+    """
+
+    def __init__(self, folder, name, table, columns, server_folder=None,
+                 preamble=(), postamble=()):
+        self.folder = folder
+        self.name = name
+        self.table = table
+        self.columns = list(columns)
+        self.server_folder = server_folder or folder
+        self.preamble = list(preamble)
+        self.postamble = list(postamble)
+        self.rows = 0
+        self.sanitized = 0
+
+        os.makedirs(folder, exist_ok=True)
+        self.data_path = os.path.join(folder, f"{name}.tsv")
+        self.format_path = os.path.join(folder, f"{name}.fmt")
+        self.loader_path = os.path.join(folder, f"{name}_load.sql")
+        self._data = open(self.data_path, "w", encoding="utf-8", newline="")
+
+    def write_row(self, values):
+        """One row, values in the order of `columns`."""
+        if len(values) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} values, got {len(values)}")
+        fields = []
+        for value in values:
+            field = bulk_field(value)
+            if isinstance(value, str) and not isinstance(value, SqlRaw) and field != value:
+                self.sanitized += 1
+            fields.append(field)
+        self._data.write(FIELD_TERMINATOR.join(fields) + ROW_TERMINATOR)
+        self.rows += 1
+
+    def write_rows(self, rows):
+        for values in rows:
+            self.write_row(values)
+
+    def _server_path(self, path):
+        separator = "\\" if "\\" in self.server_folder else "/"
+        return self.server_folder.rstrip("\\/") + separator + os.path.basename(path)
+
+    def loader_sql(self):
+        names = ", ".join(f"[{name}]" for name, _ in self.columns)
+        lines = ["SET XACT_ABORT ON;", "SET NOCOUNT ON;"]
+        lines += [statement.rstrip(";") + ";" for statement in self.preamble]
+        lines += [
+            "BEGIN TRANSACTION;",
+            f"INSERT INTO {self.table} WITH (TABLOCK) ({names})",
+            f"SELECT {names}",
+            "FROM OPENROWSET(",
+            f"    BULK {_sql_string(self._server_path(self.data_path))},",
+            f"    FORMATFILE = {_sql_string(self._server_path(self.format_path))},",
+            "    CODEPAGE = '65001'",
+            ") AS src;",
+            "COMMIT TRANSACTION;",
+        ]
+        lines += [statement.rstrip(";") + ";" for statement in self.postamble]
+        lines.append("GO")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        self._data.close()
+        with open(self.format_path, "w", encoding="utf-8") as f:
+            f.write(format_file_xml(self.columns))
+        with open(self.loader_path, "w", encoding="utf-8") as f:
+            f.write(self.loader_sql())
+        if self.sanitized:
+            print(f"{self.data_path}: {self.sanitized} values had tabs/line breaks replaced")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
@@ -0,0 +1,102 @@
+import json
+import time
+import sqlite3
+import threading
+
+# ----------------------------------------------------------------------------
+# Folytatható scrape: SQLite checkpoint, termék URL szerint kulcsolva.
+# Tárolja a kinyert sorokat (main + property), a kép állapotát és a
+# SLUG számlálót. Egy megszakadt futás innen folytatható, a kész termékek
+# (és képeik) kimaradnak.
+# ----------------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    url           TEXT PRIMARY KEY,
+    counter       INTEGER NOT NULL UNIQUE,
+    main_row      TEXT,
+    property_rows TEXT,
+    image_url     TEXT,
+    image_status  TEXT,
+    updated       REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class CheckpointStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def assign_counters(self, urls):
+        """
+        Sorszám (a SLUG alapja) minden URL-hez. A már ismert URL-ek a korábbi
+        számukat kapják, az újak a következő szabad számot, a megadott sorrendben.
+        Visszatérés: {url: counter}.
+        """
+        with self._lock, self.conn:
+            known = dict(self.conn.execute("SELECT url, counter FROM products"))
+            row = self.conn.execute("SELECT MAX(counter) FROM products").fetchone()
+            next_counter = (row[0] or 0) + 1
+            for url in urls:
+                if url in known:
+                    continue
+                known[url] = next_counter
+                self.conn.execute(
+                    "INSERT INTO products (url, counter, updated) VALUES (?, ?, ?)",
+                    (url, next_counter, time.time()),
+                )
+                next_counter += 1
+        return {url: known[url] for url in urls}
+
+    def finished_urls(self):
+        """Azok az URL-ek, amelyek sorai már el vannak mentve."""
+        with self._lock:
+            return {url for (url,) in self.conn.execute(
+                "SELECT url FROM products WHERE main_row IS NOT NULL"
+            )}
+
+    def load_product(self, url):
+        """(main_row, property_rows, image_url, image_status) vagy None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT main_row, property_rows, image_url, image_status "
+                "FROM products WHERE url = ? AND main_row IS NOT NULL",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), json.loads(row[1] or "[]"), row[2], row[3]
+
+    def save_product(self, url, main_row, property_rows, image_url):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE products SET main_row = ?, property_rows = ?, image_url = ?, updated = ? "
+                "WHERE url = ?",
+                (
+                    json.dumps(main_row, ensure_ascii=False),
+                    json.dumps(property_rows, ensure_ascii=False),
+                    image_url,
+                    time.time(),
+                    url,
+                ),
+            )
+
+    def set_image_status(self, url, status):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE products SET image_status = ?, updated = ? WHERE url = ?",
+                (status, time.time(), url),
+            )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
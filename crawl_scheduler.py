@@ -0,0 +1,199 @@
+import time
+import random
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from urllib.parse import urlsplit
+
+# ----------------------------------------------------------------------------
+# Hostonkénti, önhangoló sebességkorlát (AIMD) a crawlhoz.
+# Az oldal-letöltő (fetcher) és a képletöltő (ImageDownloader) ugyanazt az
+# ütemezőt használja, így egy hoston a kettő együtt sem lépi túl a keretet.
+# Hostonként két keret van:
+#   - párhuzamosság (egyszerre futó kérések) és
+#   - kérés/mp (a kérések indítása közötti minimális idő).
+# Gyors, hibátlan válaszoknál mindkettő lassan (additívan) nő; 429/5xx,
+# hálózati hiba vagy a megszokottnál jóval lassabb válasz esetén feleződik
+# (multiplikatív csökkentés). Az újrapróbálások jitteres, exponenciális
+# várakozással indulnak (a Retry-After fejlécet is figyelembe véve).
+# ----------------------------------------------------------------------------
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class Slot:
+    """Egy engedélyezett kérés; a hívó a válasz státuszát a response()-szal jelzi."""
+
+    def __init__(self, host, started):
+        self.host = host
+        self.started = started
+        self.status = None
+        self.latency = None
+        self.retry_after = None
+
+    def response(self, status, headers=None):
+        """A válasz megérkezett (az első bájtig mért idő számít késleltetésnek)."""
+        self.status = status
+        self.latency = time.monotonic() - self.started
+        if headers is not None:
+            value = headers.get("Retry-After")
+            if value and value.strip().isdigit():
+                self.retry_after = int(value.strip())
+
+    @property
+    def ok(self):
+        return self.status is not None and self.status < 400
+
+
+class HostBudget:
+    def __init__(self, concurrency, rate):
+        self.limit = float(concurrency)
+        self.rate = float(rate)
+        self.in_flight = 0
+        self.next_start = 0.0
+        self.baseline = None      # a jellemző (alsó burkoló) válaszidő
+        self.last_decrease = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.decreases = 0
+
+
+class CrawlScheduler:
+    def __init__(self, initial_concurrency=4, min_concurrency=1, max_concurrency=16,
+                 initial_rate=8.0, min_rate=0.5, max_rate=50.0, rate_step=2.0,
+                 slow_factor=3.0, max_retries=3, backoff_base=0.5, backoff_max=30.0):
+        """
+        slow_factor: ennyiszer lassabb válasz (a hostra jellemzőhöz képest)
+        túlterhelésnek számít és csökkenti a keretet.
+        """
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.slow_factor = slow_factor
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    # ------------------------------------------------------------------
+    # Keret kezelés
+    # ------------------------------------------------------------------
+    def _budget(self, host):
+        budget = self._hosts.get(host)
+        if budget is None:
+            budget = self._hosts[host] = HostBudget(self.initial_concurrency, self.initial_rate)
+        return budget
+
+    def _try_acquire(self, host):
+        """Slot, ha most indulhat kérés; különben a javasolt várakozás (mp)."""
+        now = time.monotonic()
+        budget = self._budget(host)
+        if budget.in_flight >= int(budget.limit):
+            return None, 0.05
+        if now < budget.next_start:
+            return None, budget.next_start - now
+        budget.in_flight += 1
+        budget.requests += 1
+        budget.next_start = now + 1.0 / budget.rate
+        return Slot(host, now), 0.0
+
+    def _release(self, slot):
+        with self._changed:
+            budget = self._hosts[slot.host]
+            budget.in_flight -= 1
+            now = time.monotonic()
+            overloaded = not slot.ok and (slot.status is None or slot.status in RETRY_STATUSES)
+            if slot.ok and slot.latency is not None:
+                if budget.baseline is None or slot.latency < budget.baseline:
+                    budget.baseline = slot.latency
+                else:
+                    budget.baseline += 0.02 * (slot.latency - budget.baseline)
+                overloaded = slot.latency > self.slow_factor * budget.baseline
+            if not slot.ok:
+                budget.errors += 1
+
+            if overloaded:
+                # Egy "körön" belül csak egyszer felezünk (a párhuzamosan
+                # futó kérések hibái ugyanarra a túlterhelésre vonatkoznak)
+                window = max(budget.baseline or 0.0, 1.0 / budget.rate)
+                if now - budget.last_decrease >= window:
+                    budget.limit = max(self.min_concurrency, budget.limit / 2)
+                    budget.rate = max(self.min_rate, budget.rate / 2)
+                    budget.last_decrease = now
+                    budget.decreases += 1
+                if slot.retry_after:
+                    budget.next_start = max(budget.next_start, now + slot.retry_after)
+            elif slot.ok:
+                budget.limit = min(self.max_concurrency, budget.limit + 1.0 / budget.limit)
+                budget.rate = min(self.max_rate, budget.rate + self.rate_step / budget.rate)
+            self._changed.notify_all()
+
+    # ------------------------------------------------------------------
+    # Szinkron és aszinkron slot
+    # ------------------------------------------------------------------
+    @contextmanager
+    def slot(self, url):
+        """Blokkoló várakozás a host keretére (szálakból, pl. képletöltés)."""
+        host = urlsplit(url).netloc
+        with self._changed:
+            while True:
+                slot, wait = self._try_acquire(host)
+                if slot is not None:
+                    break
+                self._changed.wait(wait)
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    @asynccontextmanager
+    async def aslot(self, url):
+        """Nem blokkoló várakozás a host keretére (asyncio, pl. oldal-letöltés)."""
+        host = urlsplit(url).netloc
+        while True:
+            with self._lock:
+                slot, wait = self._try_acquire(host)
+            if slot is not None:
+                break
+            await asyncio.sleep(wait)
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    # ------------------------------------------------------------------
+    # Újrapróbálás
+    # ------------------------------------------------------------------
+    def should_retry(self, slot, attempt):
+        """Igaz, ha a kérés (hálózati hiba, 429 vagy 5xx) újrapróbálható még."""
+        if attempt >= self.max_retries:
+            return False
+        return slot.status is None or slot.status in RETRY_STATUSES
+
+    def backoff(self, attempt, slot=None):
+        """Full-jitter exponenciális várakozás; Retry-After esetén legalább annyi."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if slot is not None and slot.retry_after:
+            delay = max(delay, min(self.backoff_max, slot.retry_after))
+        return delay
+
+    # ------------------------------------------------------------------
+    # Összesítés
+    # ------------------------------------------------------------------
+    def report(self):
+        with self._lock:
+            items = sorted(self._hosts.items())
+        for host, budget in items:
+            baseline = f"{budget.baseline:.2f}s" if budget.baseline is not None else "-"
+            print(
+                f"Ütemező {host}: {budget.requests} kérés, {budget.errors} hiba, "
+                f"{budget.decreases} visszavétel; végső keret: {int(budget.limit)} párhuzamos, "
+                f"{budget.rate:.1f} kérés/mp, jellemző válaszidő {baseline}"
+            )
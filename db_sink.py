@@ -0,0 +1,272 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+from datetime import datetime
+
+# ------------------------------------------------------------------------------
+# Direct database output for the generate_*.py scripts.
+# Instead of .sql text that is pasted into SSMS, rows are sent as
+# parameterized, batched executemany calls (one transaction per table load).
+# The lookups that otherwise come from the exported TXT files (property Id by
+# PropertyName, bvin by SKU) are read back from the same connection in one
+# UNION ALL query.
+#
+#   sqlite:///path/to/file.sqlite   local stand-in with the hcc_* tables
+#   odbc:<connection string>        SQL Server through pyodbc (fast_executemany)
+#
+# Table names are the bare hcc_* names; the SQL Server sink qualifies them
+# with its schema.
+# ------------------------------------------------------------------------------
+
+BATCH_SIZE = 1000
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hcc_Product (
+    bvin    TEXT PRIMARY KEY,
+    SKU     TEXT NOT NULL,
+    StoreId INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS hcc_ProductProperty (
+    Id                   INTEGER PRIMARY KEY AUTOINCREMENT,
+    PropertyName         TEXT NOT NULL,
+    DisplayOnSite        INTEGER,
+    DisplayToDropShipper INTEGER,
+    TypeCode             INTEGER,
+    DefaultValue         TEXT,
+    CultureCode          TEXT,
+    LastUpdated          TIMESTAMP,
+    StoreId              INTEGER,
+    DisplayOnSearch      INTEGER,
+    IsLocalizable        INTEGER
+);
+CREATE TABLE IF NOT EXISTS hcc_ProductPropertyTranslations (
+    Id                      INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProductPropertyId       INTEGER NOT NULL,
+    Culture                 TEXT,
+    DisplayName             TEXT,
+    DefaultLocalizableValue TEXT
+);
+CREATE TABLE IF NOT EXISTS hcc_ProductPropertyValue (
+    Id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProductBvin   TEXT NOT NULL,
+    PropertyId    INTEGER NOT NULL,
+    PropertyValue TEXT,
+    StoreId       INTEGER
+);
+CREATE TABLE IF NOT EXISTS hcc_ProductPropertyValueTranslations (
+    Id                       INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProductPropertyValueId   INTEGER NOT NULL,
+    Culture                  TEXT,
+    PropertyLocalizableValue TEXT
+);
+CREATE TABLE IF NOT EXISTS hcc_ProductTypeXProductProperty (
+    Id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProductTypeBvin TEXT NOT NULL,
+    PropertyId      INTEGER NOT NULL,
+    SortOrder       INTEGER,
+    StoreId         INTEGER
+);
+"""
+
+
+def now():
+    """LastUpdated value (passed as a parameter instead of GETDATE())."""
+    return datetime.now().replace(microsecond=0)
+
+
+class SinkWriter:
+    """
+    Buffers rows for one table and sends them with executemany every
+    batch_size rows. Same write_row / close / with interface as the .sql
+    writers; close() commits, an exception rolls the whole load back.
+    """
+
+    def __init__(self, sink, table, columns, identity_insert=False, batch_size=BATCH_SIZE):
+        self.sink = sink
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.identity_insert = identity_insert
+        self.table = sink.table_name(table)
+        column_list = ", ".join(sink.quote(c) for c in self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        self.sql = f"INSERT INTO {self.table} ({column_list}) VALUES ({placeholders})"
+        self.rows = 0
+        self._pending = []
+        self._cursor = sink.conn.cursor()
+        sink.prepare_cursor(self._cursor)
+        if identity_insert:
+            sink.set_identity_insert(self._cursor, self.table, True)
+
+    def write_row(self, values):
+        if len(values) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} values, got {len(values)}")
+        self._pending.append(tuple(values))
+        self.rows += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        for values in rows:
+            self.write_row(values)
+
+    def flush(self):
+        if self._pending:
+            self._cursor.executemany(self.sql, self._pending)
+            self._pending = []
+
+    def close(self):
+        self.flush()
+        if self.identity_insert:
+            self.sink.set_identity_insert(self._cursor, self.table, False)
+        self.sink.conn.commit()
+        self._cursor.close()
+
+    def rollback(self):
+        self._pending = []
+        self.sink.conn.rollback()
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.rollback()
+
+
+class DatabaseSink:
+    """Base class: a DB-API connection with qmark parameters."""
+
+    conn = None
+
+    def table_name(self, table):
+        return self.quote(table)
+
+    def quote(self, name):
+        return f"[{name}]"
+
+    def prepare_cursor(self, cursor):
+        pass
+
+    def set_identity_insert(self, cursor, table, on):
+        pass
+
+    def writer(self, table, columns, identity_insert=False, batch_size=BATCH_SIZE):
+        return SinkWriter(self, table, columns, identity_insert=identity_insert, batch_size=batch_size)
+
+    def lookups(self, store_id=1):
+        """
+        {"property": {PropertyName: Id}, "bvin": {sku (lower case): bvin}},
+        read in a single round-trip.
+        """
+        sql = (
+            f"SELECT 'property', PropertyName, CAST(Id AS {self.text_type}) "
+            f"FROM {self.table_name('hcc_ProductProperty')} WHERE StoreId = ? "
+            "UNION ALL "
+            f"SELECT 'bvin', SKU, CAST(bvin AS {self.text_type}) "
+            f"FROM {self.table_name('hcc_Product')} WHERE StoreId = ?"
+        )
+        result = {"property": {}, "bvin": {}}
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, (store_id, store_id))
+            for kind, key, value in cursor.fetchall():
+                if key is None:
+                    continue
+                if kind == "property":
+                    result["property"][key] = int(value)
+                else:
+                    result["bvin"][key.lower()] = value
+        finally:
+            cursor.close()
+        return result
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SqliteSink(DatabaseSink):
+    """Local stand-in: a SQLite file with the hcc_* tables (created if missing)."""
+
+    text_type = "TEXT"
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+        self.conn.commit()
+
+    def quote(self, name):
+        return f'"{name}"'
+
+
+class PyodbcSink(DatabaseSink):
+    """SQL Server through pyodbc, with fast_executemany (array parameter binding)."""
+
+    text_type = "NVARCHAR(50)"
+
+    def __init__(self, connection_string, schema="dbo"):
+        import pyodbc
+
+        self.schema = schema
+        self.conn = pyodbc.connect(connection_string, autocommit=False)
+
+    def table_name(self, table):
+        return f"{self.quote(self.schema)}.{self.quote(table)}"
+
+    def prepare_cursor(self, cursor):
+        cursor.fast_executemany = True
+
+    def set_identity_insert(self, cursor, table, on):
+        cursor.execute(f"SET IDENTITY_INSERT {table} {'ON' if on else 'OFF'}")
+
+
+def open_sink(url):
+    """sqlite:///<path> or odbc:<connection string>."""
+    if url.startswith("sqlite:///"):
+        return SqliteSink(url[len("sqlite:///"):])
+    if url.startswith("odbc:"):
+        return PyodbcSink(url[len("odbc:"):])
+    raise ValueError(f"Unknown database URL: {url}")
+
+
+def benchmark(rows=100000):
+    """Row-by-row INSERT + commit vs. batched executemany, on a temporary SQLite sink."""
+    columns = ["ProductBvin", "PropertyId", "PropertyValue", "StoreId"]
+    data = [(f"bvin-{i // 20:06d}", i % 20 + 1, f"value {i}", 1) for i in range(rows)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        with SqliteSink(os.path.join(folder, "single.sqlite")) as sink:
+            sql = ('INSERT INTO "hcc_ProductPropertyValue" '
+                   '("ProductBvin", "PropertyId", "PropertyValue", "StoreId") VALUES (?, ?, ?, ?)')
+            single_rows = min(rows, 5000)
+            start = time.perf_counter()
+            for values in data[:single_rows]:
+                sink.conn.execute(sql, values)
+                sink.conn.commit()
+            single = (time.perf_counter() - start) / single_rows * rows
+
+        with SqliteSink(os.path.join(folder, "batched.sqlite")) as sink:
+            start = time.perf_counter()
+            with sink.writer("hcc_ProductPropertyValue", columns) as writer:
+                writer.write_rows(data)
+            batched = time.perf_counter() - start
+
+    print(f"{rows} rows")
+    print(f"  row by row, commit per row: {single:.2f} s (extrapolated from {single_rows} rows)")
+    print(f"  executemany, batch {BATCH_SIZE}:   {batched:.2f} s ({rows / batched:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,109 @@
+import queue
+import threading
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+# ----------------------------------------------------------------------------
+# WebDriver pool: N böngésző, mindegyik a saját szálán, egy közös munkasorral.
+# Az eredmények az eredeti (bemeneti) sorrendben jönnek vissza, így a
+# SLUG-ok (kit0001, kit0002, ...) a workerek számától függetlenül ugyanazok.
+# ----------------------------------------------------------------------------
+
+def chrome_driver(headless=False):
+    """Egy új Chrome példány indítása a scrape.py beállításaival."""
+    service = Service()
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless')
+    return webdriver.Chrome(service=service, options=options)
+
+
+class DriverPool:
+    """Párhuzamos böngésző workerek; minden worker a saját driverét birtokolja."""
+
+    def __init__(self, size, driver_factory=None):
+        self.size = max(1, size)
+        self.driver_factory = driver_factory or chrome_driver
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _driver(self, slot):
+        """A slot-hoz tartozó driver, szükség esetén (lustán) elindítva."""
+        with self._lock:
+            while len(self._drivers) <= slot:
+                self._drivers.append(None)
+            driver = self._drivers[slot]
+        if driver is None:
+            driver = self.driver_factory()
+            with self._lock:
+                self._drivers[slot] = driver
+        return driver
+
+    def _worker(self, slot, tasks, results, func):
+        try:
+            driver = self._driver(slot)
+        except Exception as e:
+            print(f"Nem sikerült elindítani a böngészőt (worker {slot}):", e)
+            driver = None
+        while True:
+            try:
+                idx, item = tasks.get_nowait()
+            except queue.Empty:
+                return
+            if driver is None:
+                # A feladatot visszatesszük, hátha egy másik worker elviszi
+                tasks.put((idx, item))
+                return
+            try:
+                results.put((idx, func(driver, item)))
+            except Exception as e:
+                print("Error in browser worker:", item, e)
+                results.put((idx, None))
+
+    def map(self, func, items):
+        """
+        func(driver, item) futtatása minden elemre a pool workerein.
+        Visszatérés: az eredmények listája az `items` sorrendjében
+        (hibás elemeknél None).
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        tasks = queue.Queue()
+        for idx, item in enumerate(items):
+            tasks.put((idx, item))
+        results = queue.Queue()
+
+        threads = [
+            threading.Thread(target=self._worker, args=(slot, tasks, results, func), daemon=True)
+            for slot in range(min(self.size, len(items)))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        ordered = [None] * len(items)
+        while not results.empty():
+            idx, value = results.get()
+            ordered[idx] = value
+        if not tasks.empty():
+            print(f"Feldolgozatlan elemek (nincs működő böngésző): {tasks.qsize()}")
+        return ordered
+
+    def close(self):
+        """Az összes elindított böngésző leállítása."""
+        for driver in self._drivers:
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+        self._drivers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,87 @@
+import os
+import re
+import csv
+import sys
+import openpyxl
+
+# ----------------------------------------------------------------------------
+# Soronként író (streaming) Excel export, állandó memóriahasználattal.
+# Az openpyxl write-only módja a sorokat azonnal ideiglenes fájlba írja, így
+# a teljes táblázat sosem kerül a memóriába. Minden sor egy .partial.tsv
+# naplóba is bekerül, így egy összeomlás után is helyreállítható a munkafüzet
+# (python excel_stream.py <xlsx> [sheet]).
+# ----------------------------------------------------------------------------
+
+# Egyszer fordítva (korábban minden cellánál újra lefordult)
+ILLEGAL_CHARACTERS_RE = re.compile(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]+')
+
+
+def remove_illegal_chars(text):
+    """Törli az Excel számára illegális karaktereket."""
+    return text if not isinstance(text, str) else ILLEGAL_CHARACTERS_RE.sub("", text)
+
+
+def clean_row(values):
+    """Egy sor összes cellájának tisztítása."""
+    return [remove_illegal_chars(v) for v in values]
+
+
+def journal_path(path):
+    return path + ".partial.tsv"
+
+
+class StreamingSheetWriter:
+    """Egy munkalapos xlsx, soronkénti írással; close() menti a munkafüzetet."""
+
+    def __init__(self, path, headers, sheet_name="Sheet1"):
+        self.path = path
+        self.headers = list(headers)
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_name)
+        self.sheet.append(self.headers)
+        self.rows = 0
+
+        self._journal = open(journal_path(path), "w", newline="", encoding="utf-8")
+        self._journal_writer = csv.writer(self._journal, dialect="excel-tab")
+        self._journal_writer.writerow([sheet_name] + self.headers)
+        self._journal.flush()
+
+    def append(self, row):
+        """Egy sor (dict, fejléc szerint) kiírása; a hiányzó oszlopok üresek."""
+        values = clean_row([row.get(h, "") for h in self.headers])
+        self.sheet.append(values)
+        self._journal_writer.writerow(values)
+        self._journal.flush()
+        self.rows += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def close(self):
+        """A munkafüzet mentése, majd a napló törlése."""
+        self.workbook.save(self.path)
+        self._journal.close()
+        os.remove(journal_path(self.path))
+
+
+def recover_partial(path):
+    """Munkafüzet helyreállítása a .partial.tsv naplóból (összeomlott futás után)."""
+    with open(journal_path(path), "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, dialect="excel-tab")
+        header = next(reader)
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet(header[0])
+        sheet.append(header[1:])
+        rows = 0
+        for values in reader:
+            sheet.append(values)
+            rows += 1
+    workbook.save(path)
+    print(f"Helyreállítva: {path} ({rows} sor)")
+    return rows
+
+
+if __name__ == "__main__":
+    for xlsx_path in sys.argv[1:]:
+        recover_partial(xlsx_path)
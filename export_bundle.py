@@ -0,0 +1,129 @@
+import os
+import json
+import shutil
+import hashlib
+import zipfile
+from datetime import datetime
+
+# --- Script Configuration ---
+base_path = r"D:\2022\IT_Rendszerfejlesztes\II_fazis\kiegeszitok_kulacsok"
+
+# The tree built by images_saver.py
+import_dir = os.path.join(base_path, "import_images")
+# State of import_images at the last deployment (relative path -> hash/size/mtime)
+deploy_manifest_file = os.path.join(base_path, "deployed_manifest.json")
+# Where the delta archives and the VM-side apply script are written
+bundle_dir = os.path.join(base_path, "deploy")
+
+# Name of the deleted-files list inside the archive (removed again by the apply script)
+DELETED_LIST_NAME = "_deleted_files.txt"
+
+# Already compressed formats are stored as-is, everything else is deflated
+STORED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+APPLY_SCRIPT = r"""param(
+    [Parameter(Mandatory = $true)][string]$Bundle,
+    [Parameter(Mandatory = $true)][string]$Target
+)
+# Applies an import_images delta bundle: extracts added/changed files over
+# $Target, then removes the files listed in {deleted}.
+$ErrorActionPreference = "Stop"
+New-Item -ItemType Directory -Force -Path $Target | Out-Null
+Expand-Archive -Path $Bundle -DestinationPath $Target -Force
+$deletedList = Join-Path $Target "{deleted}"
+if (Test-Path $deletedList) {{
+    Get-Content -Encoding UTF8 $deletedList | Where-Object {{ $_ }} | ForEach-Object {{
+        $path = Join-Path $Target $_
+        if (Test-Path $path) {{ Remove-Item -Force $path }}
+    }}
+    Remove-Item -Force $deletedList
+}}
+Write-Host "Applied $Bundle to $Target"
+"""
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_tree(root, previous):
+    """
+    Current state of the tree: {relative path: {"sha256", "size", "mtime_ns"}}.
+    Files whose size and mtime match the previous manifest keep their hash
+    without being read again.
+    """
+    state = {}
+    for folder, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(folder, name)
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            st = os.stat(path)
+            old = previous.get(rel)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                sha256 = old["sha256"]
+            else:
+                sha256 = file_sha256(path)
+            state[rel] = {"sha256": sha256, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return state
+
+
+def diff_states(previous, current):
+    """(changed, deleted): files added or modified since the last deployment, and files removed."""
+    changed = sorted(rel for rel, info in current.items()
+                     if rel not in previous or previous[rel]["sha256"] != info["sha256"])
+    deleted = sorted(rel for rel in previous if rel not in current)
+    return changed, deleted
+
+
+def write_bundle(bundle_path, root, changed, deleted):
+    with zipfile.ZipFile(bundle_path, "w") as zf:
+        for rel in changed:
+            ext = os.path.splitext(rel)[1].lower()
+            compression = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            zf.write(os.path.join(root, rel), rel, compress_type=compression)
+        if deleted:
+            zf.writestr(DELETED_LIST_NAME, "\n".join(deleted) + "\n", compress_type=zipfile.ZIP_DEFLATED)
+
+
+def main():
+    previous = {}
+    if os.path.exists(deploy_manifest_file):
+        with open(deploy_manifest_file, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    current = scan_tree(import_dir, previous)
+    changed, deleted = diff_states(previous, current)
+    if not changed and not deleted:
+        print("No changes since the last deployment, nothing to export.")
+        return
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    bundle_path = os.path.join(bundle_dir, f"import_images_delta_{stamp}.zip")
+    write_bundle(bundle_path, import_dir, changed, deleted)
+
+    apply_script_path = os.path.join(bundle_dir, "apply_delta.ps1")
+    with open(apply_script_path, "w", encoding="utf-8") as f:
+        f.write(APPLY_SCRIPT.format(deleted=DELETED_LIST_NAME))
+
+    # The new state becomes the deployed one; the previous manifest is kept
+    # as .bak in case this bundle never reaches the VM.
+    if os.path.exists(deploy_manifest_file):
+        shutil.copy2(deploy_manifest_file, deploy_manifest_file + ".bak")
+    with open(deploy_manifest_file, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=1, sort_keys=True)
+
+    changed_bytes = sum(current[rel]["size"] for rel in changed)
+    total_bytes = sum(info["size"] for info in current.values())
+    print(f"Bundle written: {bundle_path}")
+    print(f"{len(changed)} added/changed ({changed_bytes / 1024 ** 2:.1f} MB of "
+          f"{total_bytes / 1024 ** 2:.1f} MB), {len(deleted)} deleted")
+    print("On the VM: powershell -File apply_delta.ps1 -Bundle <bundle.zip> -Target <import_images folder>")
+
+
+if __name__ == "__main__":
+    main()
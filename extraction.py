@@ -0,0 +1,291 @@
+import re
+import json
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+
+# ----------------------------------------------------------------------------
+# Deklaratív kinyerési séma.
+# Minden mezőhöz egy szelektorlánc tartozik (fallbackekkel); a séma egyszer
+# fordul le (CSSSelector objektumokra), és oldalanként egyetlen lxml parse
+# után fut. Új bolt felvételéhez elég egy új sémát írni.
+#
+# Szelektor szintaxis: "css" -> az elem szövege (BeautifulSoup
+# get_text(strip=True) megfelelője), "css@attr" -> az attribútum értéke.
+# ----------------------------------------------------------------------------
+
+def element_text(el):
+    """Az elem összes szövegdarabja, darabonként strip-elve, összefűzve."""
+    return "".join(t.strip() for t in el.itertext())
+
+
+def _compile_selector(spec):
+    css, _, attr = spec.partition("@")
+    return CSSSelector(css.strip()), attr.strip() or None
+
+
+class Field:
+    """
+    Egy érték szelektorlánccal: az első nem üres találat nyer.
+    Ha egyik szelektor sem illeszkedik, az eredmény None; ha illeszkedik,
+    de üres, akkor "".
+    """
+
+    def __init__(self, *selectors):
+        self.selectors = selectors
+
+    def compile(self):
+        return _CompiledField([_compile_selector(s) for s in self.selectors])
+
+
+class _CompiledField:
+    def __init__(self, chain):
+        self.chain = chain
+
+    def extract(self, root):
+        matched = False
+        for selector, attr in self.chain:
+            elements = selector(root)
+            if not elements:
+                continue
+            el = elements[0]
+            if attr:
+                if attr not in el.attrib:
+                    continue
+                value = el.get(attr).strip()
+            else:
+                value = element_text(el)
+            matched = True
+            if value:
+                return value
+        return "" if matched else None
+
+
+class Values:
+    """Az összes illeszkedő elem értéke listában ("css" vagy "css@attr"), üresek nélkül."""
+
+    def __init__(self, selector):
+        self.selector = selector
+
+    def compile(self):
+        return _CompiledValues(*_compile_selector(self.selector))
+
+
+class _CompiledValues:
+    def __init__(self, selector, attr):
+        self.selector = selector
+        self.attr = attr
+
+    def extract(self, root):
+        values = []
+        for el in self.selector(root):
+            value = (el.get(self.attr) or "").strip() if self.attr else element_text(el)
+            if value:
+                values.append(value)
+        return values
+
+
+class Table:
+    """
+    Kulcs-érték sorok egy táblából: azok a sorok, amelyekben pontosan
+    két cella van. None, ha a tábla nincs az oldalon.
+    """
+
+    def __init__(self, table, row="tr", cell="td"):
+        self.table = table
+        self.row = row
+        self.cell = cell
+
+    def compile(self):
+        return _CompiledTable(CSSSelector(self.table), CSSSelector(self.row), CSSSelector(self.cell))
+
+
+class _CompiledTable:
+    def __init__(self, table, row, cell):
+        self.table = table
+        self.row = row
+        self.cell = cell
+
+    def extract(self, root):
+        tables = self.table(root)
+        if not tables:
+            return None
+        pairs = []
+        for row in self.row(tables[0]):
+            cols = self.cell(row)
+            if len(cols) == 2:
+                pairs.append((element_text(cols[0]), element_text(cols[1]).replace("\xa0", " ")))
+        return pairs
+
+
+class Items:
+    """Ismétlődő blokkok (pl. termékdobozok a listaoldalon), blokkonként egy al-séma."""
+
+    def __init__(self, container, fields):
+        self.container = container
+        self.fields = fields
+
+    def compile(self):
+        return _CompiledItems(CSSSelector(self.container), compile_schema(self.fields))
+
+
+class _CompiledItems:
+    def __init__(self, container, schema):
+        self.container = container
+        self.schema = schema
+
+    def extract(self, root):
+        return [self.schema.extract_tree(el) for el in self.container(root)]
+
+
+class JsonLd:
+    """
+    Beágyazott strukturált adat (<script type="application/ld+json">):
+    az első adott @type-ú objektum (dict), vagy None.
+    """
+
+    def __init__(self, type_="Product"):
+        self.type_ = type_
+
+    def compile(self):
+        return _CompiledJsonLd(CSSSelector('script[type="application/ld+json"]'), self.type_)
+
+
+class _CompiledJsonLd:
+    def __init__(self, selector, type_):
+        self.selector = selector
+        self.type_ = type_
+
+    def _matches(self, obj):
+        t = obj.get("@type")
+        return t == self.type_ or (isinstance(t, list) and self.type_ in t)
+
+    def extract(self, root):
+        for script in self.selector(root):
+            try:
+                data = json.loads(script.text or "")
+            except ValueError:
+                continue
+            stack = [data]
+            while stack:
+                obj = stack.pop(0)
+                if isinstance(obj, list):
+                    stack.extend(obj)
+                elif isinstance(obj, dict):
+                    if self._matches(obj):
+                        return obj
+                    stack.extend(obj.get("@graph", []))
+        return None
+
+
+class CompiledSchema:
+    def __init__(self, fields):
+        self.fields = fields
+
+    def extract_tree(self, root):
+        return {name: field.extract(root) for name, field in self.fields.items()}
+
+    def extract(self, html):
+        """Egyetlen parse, majd az összes mező kinyerése; visszatérés: dict."""
+        return self.extract_tree(parse_html(html))
+
+
+def compile_schema(schema):
+    """{mezőnév: Field/Table/Items/JsonLd} -> CompiledSchema."""
+    return CompiledSchema({name: spec.compile() for name, spec in schema.items()})
+
+
+def parse_html(html):
+    return lxml_html.fromstring(html)
+
+
+# ----------------------------------------------------------------------------
+# bikepro.hu sémák
+# ----------------------------------------------------------------------------
+BIKEPRO_LISTING = {
+    "products": Items("div.product-snapshot.list_div_item", {
+        "url": Field("a.img-thumbnail-link@href"),
+        "name": Field("a.img-thumbnail-link@title", "a.img-thumbnail-link"),
+        "price": Field("span.product-price"),
+    }),
+    # Lapozó: az oldalszámos linkek és a találatszám szövege (pl. "1 - 24 / 132 termék")
+    "page_links": Values("a[href*='page=']@href"),
+    "results": Field("div.pagination div.results", ".pagination .results", "div.results"),
+}
+
+BIKEPRO_PRODUCT = {
+    "params": Table("table.parameter-table"),
+    "description": Field(
+        "#productdescriptionnoparameters-wrapper span.product-desc",
+        "td.product-short-description",
+    ),
+    "image_url": Field(
+        "div.product-image-main a#product-image-link@href",
+        "img[itemprop=image]@src",
+    ),
+    "structured": JsonLd("Product"),
+}
+
+LISTING_SCHEMA = compile_schema(BIKEPRO_LISTING)
+PRODUCT_SCHEMA = compile_schema(BIKEPRO_PRODUCT)
+
+
+def apply_structured_data(fields):
+    """
+    A DOM-ból hiányzó paramétereket és leírást pótolja a beágyazott
+    schema.org Product adatból (additionalProperty, description).
+    """
+    data = fields.get("structured") or {}
+    if fields["params"] is None:
+        props = data.get("additionalProperty")
+        if isinstance(props, dict):
+            props = [props]
+        pairs = [
+            (str(p["name"]).strip(), str(p.get("value", "")).strip().replace("\xa0", " "))
+            for p in props or []
+            if isinstance(p, dict) and p.get("name")
+        ]
+        if pairs:
+            fields["params"] = pairs
+    if not fields["description"] and data.get("description"):
+        # A leírás HTML-t is tartalmazhat
+        fragment = lxml_html.fragment_fromstring(str(data["description"]), create_parent="div")
+        fields["description"] = element_text(fragment)
+    return fields
+
+
+PAGE_PARAM_RE = re.compile(r"[?&]page=(\d+)")
+RESULTS_TOTAL_RE = re.compile(r"/\s*(\d+)|(\d+)\s*(?:termék|db)")
+RESULTS_PAGES_RE = re.compile(r"(\d+)\s*oldal")
+RESULTS_RANGE_RE = re.compile(r"(\d+)\s*-\s*(\d+)")
+
+
+def listing_pagination(fields):
+    """
+    A listaoldal lapozójából: (utolsó ismert oldalszám, összes termék száma
+    vagy None, oldalméret vagy None). Az oldalszám a linkekben látható
+    legnagyobb ?page=N (vagy a találatszám szövegében szereplő "N oldal"),
+    legalább 1; az oldalméret a találatszám "1 - 24" tartományából jön.
+    """
+    last_page = 1
+    for href in fields.get("page_links") or []:
+        match = PAGE_PARAM_RE.search(href)
+        if match:
+            last_page = max(last_page, int(match.group(1)))
+    total = None
+    results = fields.get("results") or ""
+    match = RESULTS_TOTAL_RE.search(results)
+    if match:
+        total = int(match.group(1) or match.group(2))
+    match = RESULTS_PAGES_RE.search(results)
+    if match:
+        last_page = max(last_page, int(match.group(1)))
+    page_size = None
+    match = RESULTS_RANGE_RE.search(results)
+    if match and int(match.group(2)) >= int(match.group(1)):
+        page_size = int(match.group(2)) - int(match.group(1)) + 1
+    return last_page, total, page_size
+
+
+def extract_product(html):
+    """Termékoldal mezői egyetlen parse-ból, a strukturált adattal kiegészítve."""
+    return apply_structured_data(PRODUCT_SCHEMA.extract(html))
@@ -0,0 +1,136 @@
+import asyncio
+import aiohttp
+from crawl_scheduler import CrawlScheduler
+
+# ----------------------------------------------------------------------------
+# Aszinkron HTTP letöltő a termékoldalakhoz.
+# Egy közös (poolozott) aiohttp kliens, állítható párhuzamossággal; a hostonkénti
+# tempót és az újrapróbálásokat a (képletöltővel közös) CrawlScheduler adja.
+# A base URL-t a hívó adja meg, így az elmentett bikepro.hu oldalakat a helyi
+# fixture_server.py is kiszolgálhatja.
+# ----------------------------------------------------------------------------
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "hu-HU,hu;q=0.9,en;q=0.8",
+}
+
+
+async def _request(session, url, cache, slot):
+    """
+    Egy kérés (feltételes, ha van cache). Visszatérés: (státusz, html, fejlécek);
+    304 esetén a cache-ből, 200-as státusszal. A slot a fejlécek megérkezésekor
+    kapja meg a választ (a késleltetés az első bájtig, a törzs átvitele nélkül).
+    """
+    request_headers = cache.conditional_headers(url) if cache is not None else {}
+    async with session.get(url, headers=request_headers) as resp:
+        slot.response(resp.status, resp.headers)
+        if resp.status == 304 and cache is not None:
+            body = cache.hit(url, revalidated=True)
+            if body is not None:
+                return 200, body.decode("utf-8"), None
+        else:
+            return resp.status, await _decode(resp, url), resp.headers
+    # A cache bejegyzés közben eltűnt: feltétel nélkül újra
+    async with session.get(url) as retry:
+        slot.response(retry.status, retry.headers)
+        return retry.status, await _decode(retry, url), retry.headers
+
+
+async def _decode(resp, url):
+    """A válasz szövege; hibás / ismeretlen karakterkódolásnál None (nem hálózati hiba, nincs újrapróbálás)."""
+    try:
+        return await resp.text()
+    except (UnicodeDecodeError, LookupError) as e:
+        print("Nem dekódolható oldal:", url, e)
+        return None
+
+
+async def _fetch_one(session, semaphore, scheduler, url, cache=None):
+    """Egy oldal letöltése; hiba esetén None-t ad vissza a HTML helyett."""
+    if cache is not None:
+        body = cache.fresh(url)
+        if body is not None:
+            return url, body.decode("utf-8")
+    attempt = 0
+    while True:
+        async with semaphore:
+            async with scheduler.aslot(url) as slot:
+                try:
+                    status, text, resp_headers = await _request(session, url, cache, slot)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print("Error fetching page:", url, e)
+                    status, text, resp_headers = None, None, None
+        if status == 200:
+            break
+        if not scheduler.should_retry(slot, attempt):
+            if status is not None:
+                print(f"HTTP {status}: {url}")
+            return url, None
+        await asyncio.sleep(scheduler.backoff(attempt, slot))
+        attempt += 1
+    if text is None:
+        return url, None
+    if cache is not None and resp_headers is not None:
+        try:
+            cache.store(url, text.encode("utf-8"), resp_headers)
+        except OSError as e:
+            # A cache hibája nem veszti el a már letöltött oldalt (és nem állítja le a többit)
+            print("Cache írási hiba:", url, e)
+    return url, text
+
+
+async def _fetch_and_deliver(session, semaphore, scheduler, url, cache, delivery, on_page):
+    """
+    Letöltés, majd átadás az on_page-nek egy szálon (az on_page blokkolhat).
+    A `delivery` szemafor a letöltést és az átadást együtt fogja, így ha az
+    on_page blokkol, új kérés sem indul.
+    """
+    async with delivery:
+        url, html = await _fetch_one(session, semaphore, scheduler, url, cache)
+        await asyncio.to_thread(on_page, url, html)
+
+
+async def fetch_pages(urls, concurrency=8, timeout=15, headers=None, cache=None, scheduler=None,
+                      on_page=None):
+    """
+    Letölti a megadott URL-eket legfeljebb `concurrency` párhuzamos kéréssel.
+    Ha `cache` (HttpCache) meg van adva, feltételes kérést küld, és 304 esetén
+    a tárolt oldalt adja vissza. A `scheduler` (CrawlScheduler) hostonként
+    tovább korlátozza a tempót; ha nincs megadva, egy saját példány készül.
+    Visszatérés: {url: html vagy None}.
+    Ha `on_page(url, html vagy None)` meg van adva, minden oldal azonnal ennek
+    adódik át (nem gyűlnek össze, a visszatérési érték üres dict); a blokkoló
+    on_page a letöltést is visszafogja (backpressure).
+    """
+    scheduler = scheduler or CrawlScheduler()
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=client_timeout,
+        headers=headers or DEFAULT_HEADERS,
+    ) as session:
+        if on_page is not None:
+            delivery = asyncio.Semaphore(concurrency)
+            await asyncio.gather(*[
+                _fetch_and_deliver(session, semaphore, scheduler, url, cache, delivery, on_page)
+                for url in dict.fromkeys(urls)
+            ])
+            return {}
+        tasks = [_fetch_one(session, semaphore, scheduler, url, cache) for url in dict.fromkeys(urls)]
+        results = await asyncio.gather(*tasks)
+    return dict(results)
+
+
+def fetch_all(urls, concurrency=8, timeout=15, headers=None, cache=None, scheduler=None, on_page=None):
+    """Szinkron burkoló a fetch_pages köré (a scrape script nem aszinkron)."""
+    return asyncio.run(
+        fetch_pages(urls, concurrency=concurrency, timeout=timeout, headers=headers, cache=cache,
+                    scheduler=scheduler, on_page=on_page)
+    )
@@ -0,0 +1,81 @@
+import os
+import sys
+import threading
+import urllib.request
+from urllib.parse import urlsplit, quote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ----------------------------------------------------------------------------
+# Helyi tesztszerver elmentett bikepro.hu oldalakkal (fixture-ök), hogy a
+# fetcher és a scrape.py az élő oldal terhelése nélkül is futtatható legyen.
+#
+#   python fixture_server.py save <mappa> <url> [<url> ...]   oldalak mentése
+#   python fixture_server.py serve <mappa> [port]              kiszolgálás
+#
+# Fájlonként egy oldal, a név az URL útvonala + query (kódolva). A kiszolgált
+# oldalakban az élő site címe (SITE_ORIGIN) a helyi szerver címére cserélődik,
+# így az abszolút linkek is ide mutatnak. A scrape.py base_url-je ekkor pl.
+# http://127.0.0.1:8765/kerekpar_kiegeszitok/kulacs_kulacstarto_329/kulacs_486
+# A nem mentett címekre (pl. képek) 404 a válasz.
+# ----------------------------------------------------------------------------
+
+SITE_ORIGIN = "https://bikepro.hu"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+
+def fixture_name(url):
+    """Az oldal fájlneve a fixture mappában (útvonal + query, a host nem számít)."""
+    parts = urlsplit(url)
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    return quote(path, safe="") + ".html"
+
+
+def save_fixtures(folder, urls):
+    """Az oldalak letöltése az élő site-ról a fixture mappába."""
+    os.makedirs(folder, exist_ok=True)
+    for url in urls:
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(request, timeout=30) as resp:
+            body = resp.read()
+        with open(os.path.join(folder, fixture_name(url)), "wb") as f:
+            f.write(body)
+        print(f"Mentve: {url} ({len(body)} bájt)")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = os.path.join(self.server.folder, fixture_name(self.path))
+        if not os.path.exists(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            body = f.read().replace(SITE_ORIGIN.encode(), self.server.origin.encode())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(folder, host="127.0.0.1", port=0):
+    """A szerver indítása háttérszálon (port=0: szabad port); server.origin a címe."""
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.folder = folder
+    server.origin = f"http://{host}:{server.server_port}"
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 4 and sys.argv[1] == "save":
+        save_fixtures(sys.argv[2], sys.argv[3:])
+    elif len(sys.argv) >= 3 and sys.argv[1] == "serve":
+        server = serve_fixtures(sys.argv[2], port=int(sys.argv[3]) if len(sys.argv) > 3 else 8765)
+        print(f"Fixture szerver: {server.origin} ({sys.argv[2]})")
+        threading.Event().wait()
+    else:
+        print("python fixture_server.py save <mappa> <url> [<url> ...] | serve <mappa> [port]")
+        sys.exit(1)
@@ -1,5 +1,9 @@
 import os
 import openpyxl
+from artifacts import ArtifactStore, artifact_path
+from sql_emitter import SqlBatchWriter, SqlRaw
+from db_sink import open_sink, now
+from property_catalog import PropertyCatalog, catalog_path
 
 # 1) Projekt elérési út: 
 PROJECT_PATH = r"D:\2022\IT_Rendszerfejlesztes\II_fazis\kiegeszitok_kulacsok"
@@ -8,19 +12,43 @@ EXPORT_PATH = PROJECT_PATH
 # 2) Globális változó, amit manuálisan lehet módosítani:
 GLOBAL_CATEGORY = "_kiegeszitok_kulacsok"
 
-def generate_sql_insert_from_excel(excel_file_name, output_sql_file):
+# Ha meg van adva (pl. "odbc:DRIVER=...;SERVER=...;DATABASE=PerfektDatabase;..."
+# vagy "sqlite:///teszt.sqlite"), a sorok közvetlenül az adatbázisba kerülnek
+# (db_sink), .sql fájl helyett
+DB_URL = None
+
+PROPERTY_TABLE = "[PerfektDatabase].[dbo].[hcc_ProductProperty]"
+PROPERTY_COLUMNS = [
+    "PropertyName",
+    "DisplayOnSite",
+    "DisplayToDropShipper",
+    "TypeCode",
+    "DefaultValue",
+    "CultureCode",
+    "LastUpdated",
+    "StoreId",
+    "DisplayOnSearch",
+    "IsLocalizable",
+]
+
+def load_property_names(excel_file_name):
     """
-    Beolvassa az excel_file_name fájlt a PROJECT_PATH alatt,
-    kigyűjti a B oszlopból az egyedi PropertyName értékeket,
-    kiegészíti őket a GLOBAL_CATEGORY értékkel,
-    majd generál egy SQL insert fájlt.
+    Az egyedi PropertyName értékek, rendezve: a scrape által írt
+    pipeline.sqlite-ból, ha létezik, különben az Excel B oszlopából.
     """
+    store_path = artifact_path(PROJECT_PATH)
+    if os.path.exists(store_path):
+        store = ArtifactStore(store_path)
+        try:
+            return [name.strip() for name in store.property_names()]
+        finally:
+            store.close()
 
     # Excel fájl elérési útja
     excel_file_path = os.path.join(PROJECT_PATH, excel_file_name)
 
     # Excel betöltése
-    wb = openpyxl.load_workbook(excel_file_path)
+    wb = openpyxl.load_workbook(excel_file_path, read_only=True)
     ws = wb.active  # Ha több munkalap van, megadhatod pl. wb["Munka1"]
 
     # Egyedi tulajdonságnevek kinyerése a B oszlopból (2. oszlop),
@@ -34,7 +62,20 @@ def generate_sql_insert_from_excel(excel_file_name, output_sql_file):
                 property_names.add(prop)
 
     # Rendezés (opcionális)
-    sorted_property_names = sorted(property_names)
+    return sorted(property_names)
+
+
+def generate_sql_insert_from_excel(excel_file_name, output_sql_file):
+    """
+    Kigyűjti az egyedi PropertyName értékeket (pipeline.sqlite vagy az
+    excel_file_name fájl B oszlopa a PROJECT_PATH alatt), kiegészíti őket a
+    GLOBAL_CATEGORY értékkel, majd generál egy SQL insert fájlt.
+    """
+    # A property katalógus (a kategóriamappák mellett): egységes nevek, és
+    # kihagyjuk azokat, amelyeknek már van Id-juk (már léteznek az adatbázisban)
+    catalog = PropertyCatalog(catalog_path(os.path.dirname(PROJECT_PATH)))
+    names = {catalog.intern(GLOBAL_CATEGORY, name) for name in load_property_names(excel_file_name)}
+    sorted_property_names = sorted(name for name in names if catalog.db_id(GLOBAL_CATEGORY, name) is None)
 
     # Először kiírjuk az egyedi értékeket a konzolra
     print("Egyedi property nevek (B oszlopból) - GLOBAL_CATEGORY hozzáfűzéssel:")
@@ -43,44 +84,42 @@ def generate_sql_insert_from_excel(excel_file_name, output_sql_file):
         prop_name_with_category = f"{prop_name}{GLOBAL_CATEGORY}"
         print(prop_name_with_category)
 
-    # Ezután generáljuk az SQL INSERT parancsokat
+    # Közvetlen adatbázis-írás: kötegelt executemany, GETDATE() helyett
+    # paraméterként átadott időbélyeggel
+    if DB_URL:
+        with open_sink(DB_URL) as sink:
+            with sink.writer("hcc_ProductProperty", PROPERTY_COLUMNS) as writer:
+                writer.write_rows(property_rows(catalog, sorted_property_names, now()))
+            # Az új Id-k visszaolvasása a katalógusba
+            catalog.import_db_ids(GLOBAL_CATEGORY, sink.lookups()["property"].items())
+        catalog.close()
+        return
+
+    # Ezután generáljuk az SQL INSERT parancsokat: több soros VALUES
+    # kötegekben, explicit tranzakcióban (sql_emitter)
     with open(output_sql_file, "w", encoding="utf-8") as f:
-        for prop_name in sorted_property_names:
-            # Itt is hozzáfűzzük a GLOBAL_CATEGORY-t
-            prop_name_with_category = f"{prop_name}{GLOBAL_CATEGORY}"
-
-            # Ha idézőjelet (') tartalmaz, duplázzuk
-            safe_prop_name = prop_name_with_category.replace("'", "''")
-
-            insert_statement = f"""
-INSERT INTO [PerfektDatabase].[dbo].[hcc_ProductProperty]
-(
-    [PropertyName],
-    [DisplayOnSite],
-    [DisplayToDropShipper],
-    [TypeCode],
-    [DefaultValue],
-    [CultureCode],
-    [LastUpdated],
-    [StoreId],
-    [DisplayOnSearch],
-    [IsLocalizable]
-)
-VALUES
-(
-    '{safe_prop_name}',
-    1,            -- DisplayOnSite
-    0,            -- DisplayToDropShipper
-    1,       -- TypeCode (példaként TEXT)
-    '',           -- DefaultValue
-    'hu-HU',      -- CultureCode
-    GETDATE(),    -- LastUpdated
-    1,            -- StoreId (példa)
-    1,            -- DisplayOnSearch
-    0             -- IsLocalizable
-);
-"""
-            f.write(insert_statement)
+        with SqlBatchWriter(f, PROPERTY_TABLE, PROPERTY_COLUMNS) as writer:
+            writer.write_rows(property_rows(catalog, sorted_property_names, SqlRaw("GETDATE()")))
+    catalog.close()
+
+
+def property_rows(catalog, sorted_property_names, last_updated):
+    """A PROPERTY_COLUMNS szerinti sorok, a GLOBAL_CATEGORY hozzáfűzésével."""
+    for prop_name in sorted_property_names:
+        # Itt is hozzáfűzzük a GLOBAL_CATEGORY-t (a katalógus névképzése szerint)
+        prop_name_with_category = catalog.db_name(GLOBAL_CATEGORY, prop_name)
+        yield [
+            prop_name_with_category,
+            1,             # DisplayOnSite
+            0,             # DisplayToDropShipper
+            1,             # TypeCode (példaként TEXT)
+            "",            # DefaultValue
+            "hu-HU",       # CultureCode
+            last_updated,  # LastUpdated
+            1,             # StoreId (példa)
+            1,             # DisplayOnSearch
+            0,             # IsLocalizable
+        ]
 
 if __name__ == "__main__":
     # Az Excel-fájl neve a projektmappában
@@ -89,4 +128,7 @@ if __name__ == "__main__":
     output_sql_file = os.path.join(EXPORT_PATH, "new_properties_o_u_alk_vazak.sql")
 
     generate_sql_insert_from_excel(excel_file_name, output_sql_file)
-    print(f"\nSQL parancsok elkészültek a(z) '{output_sql_file}' fájlban.")
+    if DB_URL:
+        print("\nA property-k bekerültek az adatbázisba.")
+    else:
+        print(f"\nSQL parancsok elkészültek a(z) '{output_sql_file}' fájlban.")
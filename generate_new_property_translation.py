@@ -1,47 +1,57 @@
 #!/usr/bin/env python3
 import os
+from artifacts import ArtifactStore, artifact_path
+from sql_emitter import stdout_writer
+from db_sink import open_sink
+from property_catalog import PropertyCatalog, catalog_path
 
 filename = r"D:\2022\IT_Rendszerfejlesztes\II_fazis\kiegeszitok_kulacsok\kulacsok_property.txt"
 
 # Globális változó, mely tartalmazza azt az értéket, amit eltávolítunk
 global_tag = "_kiegeszitok_kulacsok"
 
-# Ellenőrizzük, hogy a fájl létezik-e
-if not os.path.exists(filename):
-    print(f"A(z) {filename} fájl nem található!")
-    exit(1)
-
-# Fájl beolvasása, sortörésenként
-with open(filename, "r", encoding="utf-8") as f:
-    lines = f.read().splitlines()
-
-# Az első sor a fejléc, azt kihagyjuk
-header = lines[0]
-data_lines = lines[1:]
-
-# Kiírjuk a globális SQL változó deklarációját
-print(f"DECLARE @global_tag NVARCHAR(10) = '{global_tag}';\n")
-
-# Minden sor feldolgozása
-for line in data_lines:
-    # Üres sorok kihagyása
-    if not line.strip():
-        continue
-    # Feltételezzük, hogy tab karakterrel vannak elválasztva a mezők
-    parts = line.split('\t')
-    # Ha nem tab-okkal vannak elválasztva, akkor szóközökkel próbálkozunk
-    if len(parts) < 2:
-        parts = line.split()
-    if len(parts) < 2:
-        continue
-
-    property_id = parts[0].strip()
-    property_name = parts[1].strip()
-
-    # SQL INSERT statement generálása
-    sql = f"""INSERT INTO [PerfektDatabase].[dbo].[hcc_ProductPropertyTranslations]
-           ([ProductPropertyId], [Culture], [DisplayName], [DefaultLocalizableValue])
-VALUES 
-({property_id}, 'hu-HU', REPLACE('{property_name}', @global_tag, ''), 'NULL');
-"""
-    print(sql)
\ No newline at end of file
+# Ha meg van adva (pl. "odbc:DRIVER=...;DATABASE=PerfektDatabase;..." vagy
+# "sqlite:///teszt.sqlite"), az Id-k az adatbázisból jönnek és a fordítások
+# közvetlenül oda kerülnek (db_sink); ekkor a txt export nem kell
+DB_URL = None
+
+columns = ["ProductPropertyId", "Culture", "DisplayName", "DefaultLocalizableValue"]
+
+if DB_URL:
+    sink = open_sink(DB_URL)
+    # Id-k egy lekérdezéssel (PropertyName, Id)
+    property_pairs = sink.lookups()["property"].items()
+    writer = sink.writer("hcc_ProductPropertyTranslations", columns)
+else:
+    # Ellenőrizzük, hogy a fájl létezik-e
+    if not os.path.exists(filename):
+        print(f"A(z) {filename} fájl nem található!")
+        exit(1)
+
+    # Az export beolvasása (Id, PropertyName); a pipeline.sqlite-ban tárolva,
+    # csak akkor olvassuk újra a txt-t, ha az megváltozott
+    store = ArtifactStore(artifact_path(os.path.dirname(filename)))
+    df_property = store.load_export("property", filename)
+    store.close()
+    property_pairs = zip(df_property["propertyname"], df_property["id"])
+
+    # SQL kiírása a konzolra, több soros VALUES kötegekben, tranzakcióban.
+    # A global_tag eltávolítása Pythonban történik (korábban SQL REPLACE
+    # egy túl rövid, NVARCHAR(10) változóval, ami csonkolta a taget).
+    writer = stdout_writer("[PerfektDatabase].[dbo].[hcc_ProductPropertyTranslations]", columns)
+
+# Az Id-k rögzítése a property katalógusban (a global_tag utótag levágásával,
+# csak az ehhez a kategóriához tartozó property-k); a többi script is innen
+# olvassa őket
+catalog = PropertyCatalog(catalog_path(os.path.dirname(os.path.dirname(filename))))
+catalog.import_db_ids(global_tag, property_pairs)
+
+# Minden property egy fordítás, a katalógus szerinti névvel
+for property_name, property_id in sorted(catalog.db_ids(global_tag).items(), key=lambda item: item[1]):
+    writer.write_row([property_id, "hu-HU", property_name, "NULL"])
+
+catalog.close()
+writer.close()
+if DB_URL:
+    sink.close()
+    print(f"{writer.rows} fordítás bekerült az adatbázisba.")
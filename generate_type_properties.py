@@ -1,5 +1,11 @@
 import os
+import openpyxl
 import pandas as pd
+from artifacts import ArtifactStore, artifact_path
+from sql_emitter import SqlBatchWriter, file_writer, sql_string_series
+from bulk_load import BulkLoadWriter, NVARCHAR, BIGINT
+from db_sink import open_sink
+from property_catalog import PropertyCatalog, catalog_path
 
 # Global variable: the suffix to remove from property names in the mapping file
 SUFFIX_TO_REMOVE = "_kiegeszitok_kulacsok"
@@ -9,107 +15,203 @@ SUFFIX_TO_REMOVE = "_kiegeszitok_kulacsok"
 # ------------------------------------------------------------------------------
 base_path = r'D:\2022\IT_Rendszerfejlesztes\II_fazis\kiegeszitok_kulacsok'
 
-# ------------------------------------------------------------------------------
-# 1) Read the Excel file (Sheet1) from 'bringaland_hotcakes_import_tisztitott_property.xlsx'
-# ------------------------------------------------------------------------------
-excel_file = os.path.join(base_path, 'bringaland_hotcakes_import_tisztitott_property.xlsx')
-df_props = pd.read_excel(excel_file, sheet_name='Sheet1')
-
-# Clean only the column headers for internal use (lowercase).
-# This does NOT alter the actual "Property Name" or "Value" text in the cells.
-df_props.columns = df_props.columns.str.strip().str.lower()
+# Output mode:
+#   "insert" - insert_statements.sql with batched INSERTs (run in SSMS)
+#   "bulk"   - bulk_load/property_values.tsv + .fmt + _load.sql
+#              (OPENROWSET(BULK ...) load, for large categories)
+#   "db"     - rows go straight into DB_URL (db_sink); the property ids and
+#              bvins are read from the same database instead of the TXT exports
+OUTPUT_MODE = "insert"
+# The bulk_load folder as seen by the SQL Server service (None = same path)
+BULK_SERVER_FOLDER = None
+# "odbc:<connection string>" or "sqlite:///<path>" (OUTPUT_MODE = "db")
+DB_URL = None
+
+# Property rows processed per chunk; memory use depends on this, not on the
+# size of the catalog
+CHUNK_SIZE = 100000
+
+
+def excel_chunks(path, sheet_name, chunksize):
+    """The property sheet as DataFrames of at most chunksize rows (read-only workbook)."""
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        header = [str(h) for h in next(rows)]
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunksize:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        wb.close()
 
-# Forward-fill the 'product slug' column. Convert product slugs to lowercase
-# if your SKUs are also in lowercase. (Adjust as needed.)
-df_props['product slug'] = df_props['product slug'].ffill().str.lower()
 
 # ------------------------------------------------------------------------------
-# 2) Read the property mapping file (ruhak_property.txt)
-#    This file contains the mapping of property names to IDs.
+# 1) Read the scraped properties from pipeline.sqlite (written by scrape.py).
+#    Falls back to the Excel file (Sheet1) from
+#    'bringaland_hotcakes_import_tisztitott_property.xlsx' for older scrapes.
+#    Both are read lazily, CHUNK_SIZE rows at a time (see step 4).
 # ------------------------------------------------------------------------------
-property_file = os.path.join(base_path, 'kulacsok_property.txt')
-df_property = pd.read_csv(property_file, delimiter='\t')
+store_path = artifact_path(base_path)
+has_artifacts = os.path.exists(store_path)
+store = ArtifactStore(store_path)
 
-# Clean the column headers in the property file (this does NOT affect the data).
-df_property.columns = df_property.columns.str.strip().str.lower()
 
-# Remove the suffix _dzsekik from the property names before building the dictionary
-df_property['propertyname'] = df_property['propertyname'].str.strip().str.replace(SUFFIX_TO_REMOVE, '', regex=False)
+def property_chunks():
+    """
+    The property rows, CHUNK_SIZE at a time. Only opened in step 5, after
+    the exports are loaded: load_export() replaces its cache table, which
+    SQLite refuses ("database table is locked") while the chunked SELECT is
+    still open on the same connection.
+    """
+    if has_artifacts:
+        return store.properties(chunksize=CHUNK_SIZE)
+    excel_file = os.path.join(base_path, 'bringaland_hotcakes_import_tisztitott_property.xlsx')
+    return excel_chunks(excel_file, 'Sheet1', CHUNK_SIZE)
 
-# Build the property mapping dictionary dynamically
-# Key: the property name as it appears in the file (minus _dzsekik)
+
+# ------------------------------------------------------------------------------
+# 2) Property name -> ID mapping from the property catalog (shared by all
+#    categories, next to the category folders). The ids are refreshed on
+#    every run from the property export (ruhak_property.txt) or from the
+#    database, so a property that was deleted and re-created in Hotcakes
+#    gets its new id; the export is cached in pipeline.sqlite and only
+#    re-parsed when the file changes. The suffix (_dzsekik) is stripped by
+#    the catalog.
+# ------------------------------------------------------------------------------
+catalog = PropertyCatalog(catalog_path(os.path.dirname(base_path)))
+if OUTPUT_MODE == 'db':
+    database = open_sink(DB_URL)
+    # Property ids and bvins in one round-trip
+    lookups = database.lookups()
+    catalog.import_db_ids(SUFFIX_TO_REMOVE, lookups['property'].items())
+else:
+    property_file = os.path.join(base_path, 'kulacsok_property.txt')
+    df_property = store.load_export('property', property_file)
+    catalog.import_db_ids(SUFFIX_TO_REMOVE, zip(df_property['propertyname'], df_property['id']))
+
+# The property mapping as a join table
+# Key: the canonical property name (suffix removed, aliases applied)
 # Value: the corresponding ID
-property_mapping = dict(zip(df_property['propertyname'], df_property['id']))
+property_ids = pd.DataFrame(
+    list(catalog.db_ids(SUFFIX_TO_REMOVE).items()), columns=['property key', 'property id']
+)
+# Unmapped / zero ids are skipped
+property_ids = property_ids[property_ids['property id'] != 0]
+property_ids['property id'] = property_ids['property id'].astype('int64')
 
 print("Mapped Property Names (suffix removed) and IDs:")
-for prop_name, prop_id in property_mapping.items():
+for prop_name, prop_id in zip(property_ids['property key'], property_ids['property id']):
     print(f"'{prop_name}': {prop_id}")
 
 # ------------------------------------------------------------------------------
 # 3) Read the bvin-SKU mapping file (ruhak_bvin_sku.txt)
 #    This file maps SKU to bvin.
 # ------------------------------------------------------------------------------
-bvin_sku_file = os.path.join(base_path, 'kulacsok_bvin_sku.txt')
-df_bvin = pd.read_csv(bvin_sku_file, delimiter='\t')
-
-# Clean column headers and ensure SKU is in lowercase (if needed).
-df_bvin.columns = df_bvin.columns.str.strip().str.lower()
+if OUTPUT_MODE == 'db':
+    df_bvin = pd.DataFrame(list(lookups['bvin'].items()), columns=['sku', 'bvin'])
+else:
+    bvin_sku_file = os.path.join(base_path, 'kulacsok_bvin_sku.txt')
+    df_bvin = store.load_export('bvin_sku', bvin_sku_file)
+
+# Ensure SKU is in lowercase (if needed). One bvin per SKU, so the join
+# below cannot multiply property rows.
 df_bvin['sku'] = df_bvin['sku'].str.lower()
+df_bvin = df_bvin[['sku', 'bvin']].dropna().drop_duplicates('sku', keep='first')
 
 # ------------------------------------------------------------------------------
-# 4) Merge the Excel data with the bvin mapping using product slug == sku
+# 4) Per chunk: join the property rows with the bvin mapping (product slug ==
+#    sku) and with the property ids (property name == mapped name).
+#    Rows with a missing bvin, property name, value or id drop out of the
+#    inner joins. The last product slug of a chunk is carried into the next
+#    one, so the forward-fill works across chunk boundaries.
 # ------------------------------------------------------------------------------
-merged = pd.merge(
-    df_props,
-    df_bvin,
-    left_on='product slug',
-    right_on='sku',
-    how='left'
-)
+def resolve_chunks(chunks):
+    last_slug = None
+    for df_props in chunks:
+        # Clean only the column headers for internal use (lowercase).
+        # This does NOT alter the actual "Property Name" or "Value" text in the cells.
+        df_props.columns = df_props.columns.str.strip().str.lower()
+
+        # Forward-fill the 'product slug' column. Convert product slugs to lowercase
+        # if your SKUs are also in lowercase. (Adjust as needed.)
+        slugs = df_props['product slug'].copy()
+        if last_slug is not None and pd.isna(slugs.iloc[0]):
+            slugs.iloc[0] = last_slug
+        slugs = slugs.ffill()
+        if len(slugs) and not pd.isna(slugs.iloc[-1]):
+            last_slug = slugs.iloc[-1]
+        df_props['product slug'] = slugs.str.lower()
+
+        df_props = df_props.dropna(subset=['product slug', 'property name', 'value'])
+        # The catalog name of each distinct property name in the chunk
+        # (whitespace stripped, aliases applied; no lowercasing)
+        names = df_props['property name'].astype(str)
+        canonical = {name: catalog.canonical(SUFFIX_TO_REMOVE, name) for name in names.unique()}
+        df_props = df_props.assign(**{'property key': names.map(canonical)})
+
+        merged = df_props.merge(df_bvin, left_on='product slug', right_on='sku', how='inner')
+        merged = merged.merge(property_ids, on='property key', how='inner')
+        yield merged[['bvin', 'property id', 'value']]
+
 
 # ------------------------------------------------------------------------------
-# 5) Generate SQL INSERT statements
+# 5) Generate the SQL INSERT statements, column-wise per chunk
 #
 # For each row:
 #   - Use the bvin from the bvin-SKU mapping.
-#   - Use the property mapping to look up the PropertyId based on the "Property Name"
-#     from the Excel, with no forced lowercasing.
-#   - Escape any single quotes in the property value.
+#   - Use the PropertyId joined in step 4.
+#   - Rows go to the writer selected by OUTPUT_MODE: batched INSERTs
+#     (sql_emitter, VALUES rows rendered as whole columns), a bulk-load data
+#     file (bulk_load) or the database itself (db_sink, batched executemany).
 # ------------------------------------------------------------------------------
 store_id = 1
-output_file = os.path.join(base_path, 'insert_statements.sql')
+table = '[PerfektDatabase].[dbo].[hcc_ProductPropertyValue]'
+columns = ['ProductBvin', 'PropertyId', 'PropertyValue', 'StoreId']
 count = 0
 
-with open(output_file, 'w', encoding='utf-8') as f:
-    for _, row in merged.iterrows():
-        bvin = row.get('bvin')
-        # Use the original case from the Excel data (now in 'property name' column).
-        tab_name = row.get('property name')
-        tab_desc = row.get('value')
-        
-        # Skip rows with missing bvin, property name, or value
-        if pd.isna(bvin) or pd.isna(tab_name) or pd.isna(tab_desc):
-            continue
-        
-        # Because we removed _dzsekik from the property file,
-        # we must match exactly what is in Excel to the new dictionary keys.
-        # No lowercasing or suffix removal is done on the Excel side.
-        prop_id = property_mapping.get(tab_name.strip())
-        if not prop_id:
-            # If the property is not mapped, skip or optionally print a debug message
-            continue
-        
-        # Escape single quotes in the property value
-        prop_value = str(tab_desc).replace("'", "''")
-        
-        # Construct the SQL INSERT statement
-        sql = (
-            f"INSERT INTO [PerfektDatabase].[dbo].[hcc_ProductPropertyValue] "
-            f"(ProductBvin, PropertyId, PropertyValue, StoreId) "
-            f"VALUES ('{bvin}', {prop_id}, '{prop_value}', {store_id});"
-        )
-        f.write(sql + "\n")
-        count += 1
-
-print(f"SQL insert statements have been written to {output_file}")
+if OUTPUT_MODE == 'bulk':
+    output = BulkLoadWriter(
+        os.path.join(base_path, 'bulk_load'),
+        'property_values',
+        table,
+        list(zip(columns, [NVARCHAR, BIGINT, NVARCHAR, BIGINT])),
+        server_folder=BULK_SERVER_FOLDER,
+    )
+    output_file = output.loader_path
+elif OUTPUT_MODE == 'db':
+    output_file = 'the database (DB_URL)'
+    output = database.writer('hcc_ProductPropertyValue', columns)
+else:
+    output_file = os.path.join(base_path, 'insert_statements.sql')
+    output = file_writer(output_file, table, columns)
+
+with output as writer:
+    for chunk in resolve_chunks(property_chunks()):
+        bvins = chunk['bvin'].astype(str)
+        values = chunk['value'].astype(str)
+        ids = chunk['property id']
+        if isinstance(writer, SqlBatchWriter):
+            rendered = (
+                '(' + sql_string_series(bvins)
+                + ', ' + ids.astype(str)
+                + ', ' + sql_string_series(values)
+                + f', {store_id})'
+            )
+            for row in rendered:
+                writer.write_rendered(row)
+        else:
+            writer.write_rows(zip(bvins, ids.tolist(), values, [store_id] * len(chunk)))
+        count += len(chunk)
+
+store.close()
+catalog.close()
+if OUTPUT_MODE == 'db':
+    database.close()
+
+print(f"Property values have been written to {output_file}")
 print(f"Total {count} records processed.")
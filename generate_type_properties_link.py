@@ -1,27 +1,67 @@
+import os
+from sql_emitter import file_writer
+from bulk_load import BulkLoadWriter, NVARCHAR, BIGINT
+from db_sink import open_sink
+
 # Global configuration
 STARTING_VALUE_ID = 2214         # The first ProductPropertyValueId
 NUM_OFFSET = 2914 - STARTING_VALUE_ID            # The number of rows to generate (last value = STARTING + NUM_OFFSET)
 
 OUTPUT_FILE = 'D:\\2022\\IT_Rendszerfejlesztes\\II_fazis\\kiegeszitok_kulacsok\\insert_translations.sql'
+TABLE = '[PerfektDatabase].[dbo].[hcc_ProductPropertyValueTranslations]'
 CULTURE = 'hu-HU'
-PROPERTY_LOCALIZABLE_VALUE = 'NULL'  # Always NULL
+PROPERTY_LOCALIZABLE_VALUE = None  # Always NULL
+
+# Output mode:
+#   "insert" - OUTPUT_FILE with batched INSERTs (run in SSMS)
+#   "bulk"   - bulk_load/value_translations.tsv + .fmt + _load.sql next to OUTPUT_FILE
+#   "db"     - rows go straight into DB_URL (db_sink, batched executemany)
+OUTPUT_MODE = "insert"
+# The bulk_load folder as seen by the SQL Server service (None = same path)
+BULK_SERVER_FOLDER = None
+# "odbc:<connection string>" or "sqlite:///<path>" (OUTPUT_MODE = "db")
+DB_URL = None
+
+COLUMNS = ['ProductPropertyValueId', 'Culture', 'PropertyLocalizableValue']
+
+# Explicit inserts for identity columns are enabled before the first
+# batch and disabled after the last one
+identity_on = [f"SET IDENTITY_INSERT {TABLE} ON"]
+identity_off = [f"SET IDENTITY_INSERT {TABLE} OFF"]
 
-with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-    # Enable explicit inserts for identity columns
-    f.write("SET IDENTITY_INSERT [PerfektDatabase].[dbo].[hcc_ProductPropertyValueTranslations] ON;\n\n")
-    
-    # Generate the INSERT statements
+if OUTPUT_MODE == 'bulk':
+    bulk_folder = os.path.join(os.path.dirname(OUTPUT_FILE), 'bulk_load')
+    output = BulkLoadWriter(
+        bulk_folder,
+        'value_translations',
+        TABLE,
+        list(zip(COLUMNS, [BIGINT, NVARCHAR, NVARCHAR])),
+        server_folder=BULK_SERVER_FOLDER,
+        preamble=identity_on,
+        postamble=identity_off,
+    )
+    output_file = output.loader_path
+elif OUTPUT_MODE == 'db':
+    database = open_sink(DB_URL)
+    output = database.writer('hcc_ProductPropertyValueTranslations', COLUMNS, identity_insert=True)
+    output_file = 'the database (DB_URL)'
+else:
+    output = file_writer(
+        OUTPUT_FILE,
+        TABLE,
+        COLUMNS,
+        preamble=identity_on,
+        postamble=identity_off,
+    )
+    output_file = OUTPUT_FILE
+
+with output as writer:
+    # Generate the rows
     for i in range(NUM_OFFSET + 1):
         value_id = STARTING_VALUE_ID + i
-        
-        sql = (
-            f"INSERT INTO [PerfektDatabase].[dbo].[hcc_ProductPropertyValueTranslations] "
-            f"(ProductPropertyValueId, Culture, PropertyLocalizableValue) "
-            f"VALUES ({value_id}, '{CULTURE}', {PROPERTY_LOCALIZABLE_VALUE});"
-        )
-        f.write(sql + "\n")
-    
-    # Disable explicit identity inserts after we're done
-    f.write("\nSET IDENTITY_INSERT [PerfektDatabase].[dbo].[hcc_ProductPropertyValueTranslations] OFF;\n")
-
-print(f"SQL insert statements have been written to {OUTPUT_FILE}")
+        writer.write_row([value_id, CULTURE, PROPERTY_LOCALIZABLE_VALUE])
+
+if OUTPUT_MODE == 'db':
+    database.close()
+
+print(f"Value translations have been written to {output_file}")
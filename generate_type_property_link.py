@@ -1,44 +1,77 @@
 #!/usr/bin/env python3
-import csv
+import os
+from artifacts import ArtifactStore, artifact_path
+from sql_emitter import stdout_writer
+from db_sink import open_sink
+from property_catalog import PropertyCatalog, catalog_path
 
 # Global constants
 PRODUCT_TYPE_BVIN = '82A6ECC8-0B97-4640-AB29-CE624FBAE2B4'
 STORE_ID = 1
 SORT_ORDER = 0
 INPUT_FILE = 'D:\\2022\\IT_Rendszerfejlesztes\\II_fazis\\kiegeszitok_kulacsok\\kulacsok_property.txt'
+# "odbc:<connection string>" or "sqlite:///<path>": read the property ids
+# from the database and insert the links there directly instead of printing SQL
+DB_URL = None
+# The category's property name suffix (GLOBAL_CATEGORY in the other scripts)
+CATEGORY_SUFFIX = '_kiegeszitok_kulacsok'
+COLUMNS = ["ProductTypeBvin", "PropertyId", "SortOrder", "StoreId"]
 
 def main():
-    # Read the file and extract the property IDs
+    # Every property id of the export, in file order (as before). With DB_URL
+    # the database has every category, so only the names with the category
+    # suffix are linked, in the database's order. The ids are also recorded
+    # in the property catalog, so the other scripts see re-created properties.
+    database = None
+    if DB_URL:
+        database = open_sink(DB_URL)
+        pairs = [(name, prop_id) for name, prop_id in database.lookups(STORE_ID)['property'].items()
+                 if str(name).strip().endswith(CATEGORY_SUFFIX)]
+    else:
+        # Read the file and extract the property IDs
+        # (cached in pipeline.sqlite, only re-parsed when the export changes)
+        store = ArtifactStore(artifact_path(os.path.dirname(INPUT_FILE)))
+        df_property = store.load_export('property', INPUT_FILE)
+        store.close()
+        pairs = list(zip(df_property['propertyname'], df_property['id']))
+    with PropertyCatalog(catalog_path(os.path.dirname(os.path.dirname(INPUT_FILE)))) as catalog:
+        catalog.import_db_ids(CATEGORY_SUFFIX, pairs)
+    values = [prop_id for _, prop_id in pairs]
+
     property_ids = []
-    with open(INPUT_FILE, 'r', encoding='utf-8-sig') as file:
-        reader = csv.DictReader(file, delimiter='\t')
-        for row in reader:
-            try:
-                prop_id = int(row['Id'])
-                property_ids.append(prop_id)
-            except ValueError:
-                continue
-
-    # Determine the boundaries from the file
+    for value in values:
+        try:
+            prop_id = int(value)
+            property_ids.append(prop_id)
+        except (TypeError, ValueError):
+            continue
+
+    # Determine the boundaries
     if property_ids:
         LOWER_BOUNDRY = min(property_ids)
         UPPER_BOUNDRY = max(property_ids)
     else:
-        print("No valid property IDs found in the file.")
+        print("No valid property IDs found for the category.")
+        if database is not None:
+            database.close()
         return
 
     # Print boundaries for confirmation (optional)
     print(f"Lower Boundary: {LOWER_BOUNDRY}")
     print(f"Upper Boundary: {UPPER_BOUNDRY}\n")
 
-    # Generate and print SQL INSERT statements
+    if database is not None:
+        with database, database.writer("hcc_ProductTypeXProductProperty", COLUMNS) as writer:
+            for prop_id in property_ids:
+                writer.write_row([PRODUCT_TYPE_BVIN, prop_id, SORT_ORDER, STORE_ID])
+        print(f"{len(property_ids)} links inserted into the database.")
+        return
+
+    # Generate and print SQL INSERT statements (batched, in transactions)
+    writer = stdout_writer("[PerfektDatabase].[dbo].[hcc_ProductTypeXProductProperty]", COLUMNS)
     for prop_id in property_ids:
-        sql = (
-            "INSERT INTO [PerfektDatabase].[dbo].[hcc_ProductTypeXProductProperty] "
-            "(ProductTypeBvin, PropertyId, SortOrder, StoreId) "
-            f"VALUES ('{PRODUCT_TYPE_BVIN}', {prop_id}, {SORT_ORDER}, {STORE_ID});"
-        )
-        print(sql)
+        writer.write_row([PRODUCT_TYPE_BVIN, prop_id, SORT_ORDER, STORE_ID])
+    writer.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,231 @@
+import os
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+
+# ----------------------------------------------------------------------------
+# Lemezes HTTP cache oldalakhoz és képekhez.
+# - index: URL -> tartalom hash (sha256), ETag, Last-Modified
+# - tartalom: objects/<hash[:2]>/<hash>, tartalom szerint címezve (ugyanaz a
+#   kép több URL-ről is csak egyszer van a lemezen)
+# - újraellenőrzés If-None-Match / If-Modified-Since fejlécekkel (304 = hit)
+# - méretkorlát, a legrégebben használt bejegyzések törlésével (LRU)
+# ----------------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url           TEXT PRIMARY KEY,
+    sha256        TEXT NOT NULL,
+    size          INTEGER NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    stored        REAL NOT NULL,
+    accessed      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS entries_sha256 ON entries (sha256);
+"""
+
+
+class HttpCache:
+    def __init__(self, folder, max_bytes=2 * 1024 ** 3, max_age=0):
+        """
+        max_bytes: a tárolt tartalom felső korlátja (LRU törlés felette).
+        max_age: ennyi mp-en belül tárolt bejegyzést hálózat nélkül adunk
+        vissza; 0 = mindig újraellenőrzés.
+        """
+        self.folder = folder
+        self.objects = os.path.join(folder, "objects")
+        os.makedirs(self.objects, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(folder, "index.sqlite"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        # A tárolt tartalom mérete (hash-enként egyszer): csak nyitáskor számolódik
+        # végig, utána a _put és az _evict tartja karban
+        self.total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT sha256, size FROM entries)"
+        ).fetchone()[0]
+        self.hits = 0           # tartalom a cache-ből (friss vagy 304)
+        self.revalidated = 0    # ebből 304 válasz
+        self.misses = 0         # teljes letöltés
+        self.evicted = 0
+
+    # ------------------------------------------------------------------
+    # Belső segédek
+    # ------------------------------------------------------------------
+    def _object_path(self, sha256):
+        return os.path.join(self.objects, sha256[:2], sha256)
+
+    def _entry(self, url):
+        row = self.conn.execute(
+            "SELECT sha256, etag, last_modified, stored FROM entries WHERE url = ?", (url,)
+        ).fetchone()
+        if row and os.path.exists(self._object_path(row[0])):
+            return row
+        return None
+
+    def _referenced(self, sha256):
+        return self.conn.execute(
+            "SELECT 1 FROM entries WHERE sha256 = ? LIMIT 1", (sha256,)
+        ).fetchone() is not None
+
+    def _put(self, url, sha256, size, headers):
+        now = time.time()
+        headers = headers or {}
+        previous = self.conn.execute("SELECT sha256, size FROM entries WHERE url = ?", (url,)).fetchone()
+        if not self._referenced(sha256):
+            self.total_bytes += size
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries (url, sha256, size, etag, last_modified, stored, accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, sha256, size, headers.get("ETag"), headers.get("Last-Modified"), now, now),
+        )
+        # Az URL korábbi tartalma, ha már semmi nem hivatkozik rá, nem számít bele
+        if previous and previous[0] != sha256 and not self._referenced(previous[0]):
+            self.total_bytes -= previous[1]
+        self.conn.commit()
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """LRU: a legrégebben használt URL-ek törlése, amíg a méret a korlát alá nem kerül."""
+        while self.total_bytes > self.max_bytes:
+            oldest = self.conn.execute(
+                "SELECT url, sha256, size FROM entries ORDER BY accessed LIMIT 100"
+            ).fetchall()
+            if not oldest:
+                break
+            for url, sha256, size in oldest:
+                self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self.evicted += 1
+                if not self._referenced(sha256):
+                    self.total_bytes -= size
+                    try:
+                        os.remove(self._object_path(sha256))
+                    except OSError:
+                        pass
+                if self.total_bytes <= self.max_bytes:
+                    break
+        self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # Publikus API
+    # ------------------------------------------------------------------
+    def _read(self, path):
+        """A cache fájl tartalma; None, ha közben (pl. egy másik szál LRU törlése miatt) eltűnt."""
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def fresh(self, url):
+        """A tárolt tartalom, ha max_age-en belüli (hálózat nélkül használható), egyébként None."""
+        path = self.fresh_path(url)
+        if path is None:
+            return None
+        return self._read(path)
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since fejlécek a tárolt bejegyzés alapján."""
+        with self._lock:
+            entry = self._entry(url)
+        headers = {}
+        if entry:
+            if entry[1]:
+                headers["If-None-Match"] = entry[1]
+            if entry[2]:
+                headers["If-Modified-Since"] = entry[2]
+        return headers
+
+    def hit(self, url, revalidated=False):
+        """Tartalom a cache-ből (pl. 304 után); None, ha közben eltűnt."""
+        path = self.touch(url, revalidated=revalidated)
+        if path is None:
+            return None
+        return self._read(path)
+
+    def store(self, url, body, headers=None):
+        """Letöltött tartalom eltárolása (200 válasz után)."""
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha256)
+        with self._lock:
+            self.misses += 1
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, path)
+            self._put(url, sha256, len(body), headers)
+
+    def temp_path(self):
+        """Ideiglenes fájlnév a cache mappán belül (streamelt letöltéshez, store_file előtt)."""
+        fd, tmp = tempfile.mkstemp(dir=self.folder, suffix=".part")
+        os.close(fd)
+        return tmp
+
+    def store_file(self, url, file_path, headers=None):
+        """
+        Lemezre streamelt letöltés eltárolása: a fájl átkerül (os.replace) a
+        cache-be, a tartalom nem töltődik be a memóriába. Visszatérés: a cache
+        fájl útvonala.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        path = self._object_path(sha256)
+        with self._lock:
+            self.misses += 1
+            if os.path.exists(path):
+                os.remove(file_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(file_path, path)
+            self._put(url, sha256, size, headers)
+        return path
+
+    def touch(self, url, revalidated=False):
+        """Találat rögzítése tartalom beolvasása nélkül; visszatérés: a cache fájl (vagy None)."""
+        with self._lock:
+            entry = self._entry(url)
+            if entry is None:
+                return None
+            self.conn.execute("UPDATE entries SET accessed = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+            self.hits += 1
+            if revalidated:
+                self.revalidated += 1
+            return self._object_path(entry[0])
+
+    def fresh_path(self, url):
+        """Mint fresh(), de a cache fájl útvonalát adja vissza."""
+        if not self.max_age:
+            return None
+        with self._lock:
+            entry = self._entry(url)
+            if entry is None or time.time() - entry[3] > self.max_age:
+                return None
+        return self.touch(url)
+
+    def report(self):
+        total = self.hits + self.misses
+        ratio = self.hits / total * 100 if total else 0.0
+        print(
+            f"HTTP cache: {self.hits} hit ({self.revalidated} újraellenőrzött / 304), "
+            f"{self.misses} miss, {ratio:.1f}% találati arány, {self.evicted} törölt bejegyzés"
+        )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,78 @@
+import os
+import json
+import hashlib
+import tempfile
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_stat(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class ImageManifest:
+    """
+    Records, per output image, the source hash, the render parameters and the
+    hashes of the written outputs, so unchanged images can be skipped.
+
+    The source is only re-hashed when its size or mtime changed since the
+    last run; a touched but identical file is still treated as unchanged.
+    """
+
+    def __init__(self, path, root):
+        """path: the manifest JSON file; root: the output folder, outputs are keyed relative to it."""
+        self.path = path
+        self.root = root
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def is_current(self, key, source_path, params, output_paths):
+        entry = self.entries.get(key)
+        if entry is None or entry["params"] != params:
+            return False
+        for path in output_paths:
+            output = entry["outputs"].get(self._relative(path))
+            if output is None or not os.path.exists(path) or os.path.getsize(path) != output["size"]:
+                return False
+        stat = source_stat(source_path)
+        source = entry["source"]
+        if stat["size"] == source["size"] and stat["mtime_ns"] == source["mtime_ns"]:
+            return True
+        if stat["size"] != source["size"] or file_sha256(source_path) != source["sha256"]:
+            return False
+        # Same content, only the timestamp changed: remember the new stat
+        source["mtime_ns"] = stat["mtime_ns"]
+        return True
+
+    def record(self, key, source, params, outputs):
+        """
+        source:  {"size", "mtime_ns", "sha256"} of the source image.
+        outputs: {path: (sha256, size)} of the rendered files.
+        """
+        self.entries[key] = {
+            "source": source,
+            "params": params,
+            "outputs": {
+                self._relative(path): {"sha256": sha256, "size": size}
+                for path, (sha256, size) in outputs.items()
+            },
+        }
+
+    def save(self):
+        folder = os.path.dirname(self.path) or "."
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,185 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from PIL import Image
+from crawl_scheduler import CrawlScheduler
+
+# ----------------------------------------------------------------------------
+# Háttérben futó képletöltés a scrape mellett.
+# - egy közös requests.Session, a workerek számához igazított connection poollal
+# - korlátozott párhuzamosság (download_workers), a hostonkénti tempót és az
+#   újrapróbálásokat a (fetcherrel közös) CrawlScheduler adja
+# - a válasz törzse streamelve kerül lemezre (nem tartjuk memóriában)
+# - a JPEG konvertálás külön szálkészleten fut, nem a crawl szálán
+# ----------------------------------------------------------------------------
+
+CHUNK_SIZE = 64 * 1024
+
+
+def convert_to_jpeg(source_path, save_path, quality=90):
+    """Alapértelmezett konvertálás: JPEG (ha nem megy, a nyers fájl másolása)."""
+    try:
+        with Image.open(source_path) as img:
+            img.convert("RGB").save(save_path, format="JPEG", quality=quality)
+        print(f"Kép letöltve és mentve: {save_path}")
+    except Exception:
+        shutil.copyfile(source_path, save_path)
+        print(f"Kép mentve (konvertálás nélkül): {save_path}")
+
+
+class ImageDownloader:
+    def __init__(self, download_workers=8, convert_workers=2, cache=None, timeout=10, quality=90,
+                 convert=None, scheduler=None):
+        """
+        convert(source_path, save_path): a letöltött fájl feldolgozása; alapból
+        JPEG konvertálás `quality` minőséggel. Hibát kivétellel jelez.
+        scheduler: közös CrawlScheduler (ha nincs megadva, saját példány).
+        """
+        self.cache = cache
+        self.scheduler = scheduler or CrawlScheduler()
+        self.timeout = timeout
+        self.convert = convert or (lambda source, save: convert_to_jpeg(source, save, quality))
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=download_workers, pool_maxsize=download_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._downloads = ThreadPoolExecutor(download_workers, thread_name_prefix="img-download")
+        self._conversions = ThreadPoolExecutor(convert_workers, thread_name_prefix="img-convert")
+        self._lock = threading.Lock()
+        self.saved = 0
+        self.failed = 0
+
+    # ------------------------------------------------------------------
+    # Letöltés
+    # ------------------------------------------------------------------
+    def _stream_to(self, resp, path):
+        with open(path, "wb") as f:
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+
+    def _download_once(self, url, save_path, slot):
+        """
+        Egy letöltési kísérlet az ütemező slotjában. Visszatérés: (forrás fájl,
+        ideiglenes-e), vagy None hiba esetén. Cache-sel a forrás a cache fájl.
+        """
+        cache = self.cache
+        headers = cache.conditional_headers(url) if cache is not None else {}
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as resp:
+            slot.response(resp.status_code, resp.headers)
+            if resp.status_code == 304 and cache is not None:
+                path = cache.touch(url, revalidated=True)
+                if path is not None:
+                    return path, False
+            elif resp.status_code == 200:
+                if cache is not None:
+                    tmp = cache.temp_path()
+                    self._stream_to(resp, tmp)
+                    return cache.store_file(url, tmp, resp.headers), False
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(save_path), suffix=".part")
+                os.close(fd)
+                self._stream_to(resp, tmp)
+                return tmp, True
+            else:
+                return None
+        # 304, de a cache bejegyzés közben eltűnt: feltétel nélkül újra
+        with self.session.get(url, timeout=self.timeout, stream=True) as resp:
+            slot.response(resp.status_code, resp.headers)
+            if resp.status_code != 200:
+                return None
+            tmp = cache.temp_path()
+            self._stream_to(resp, tmp)
+            return cache.store_file(url, tmp, resp.headers), False
+
+    def _download(self, url, save_path):
+        """
+        A kép letöltése lemezre, a közös ütemező keretén belül; 429/5xx és
+        hálózati hiba esetén jitteres várakozás után újrapróbálja.
+        Visszatérés: (forrás fájl, ideiglenes-e), vagy (None, False) hiba esetén.
+        """
+        if self.cache is not None:
+            path = self.cache.fresh_path(url)
+            if path is not None:
+                return path, False
+        attempt = 0
+        while True:
+            with self.scheduler.slot(url) as slot:
+                try:
+                    result = self._download_once(url, save_path, slot)
+                except requests.RequestException as e:
+                    print("Error downloading image:", url, e)
+                    result = None
+            if result is not None:
+                return result
+            if not self.scheduler.should_retry(slot, attempt):
+                return None, False
+            time.sleep(self.scheduler.backoff(attempt, slot))
+            attempt += 1
+
+    # ------------------------------------------------------------------
+    # Konvertálás
+    # ------------------------------------------------------------------
+    def _convert(self, source_path, is_temp, save_path):
+        """A letöltött fájl feldolgozása (self.convert); igaz, ha elkészült."""
+        try:
+            self.convert(source_path, save_path)
+            return True
+        except Exception as e:
+            print("Error saving image:", save_path, e)
+            return False
+        finally:
+            if is_temp:
+                try:
+                    os.remove(source_path)
+                except OSError:
+                    pass
+
+    def _finish(self, ok, on_done):
+        with self._lock:
+            if ok:
+                self.saved += 1
+            else:
+                self.failed += 1
+        if on_done is not None:
+            on_done(ok)
+
+    def _convert_and_finish(self, source_path, is_temp, save_path, on_done):
+        self._finish(self._convert(source_path, is_temp, save_path), on_done)
+
+    def _run(self, url, save_path, on_done):
+        """Letöltés a letöltő szálon; a konvertálás átkerül a konvertáló szálakra."""
+        try:
+            source_path, is_temp = self._download(url, save_path)
+        except Exception as e:
+            print("Error downloading image:", url, e)
+            source_path, is_temp = None, False
+        if source_path is None:
+            self._finish(False, on_done)
+            return
+        self._conversions.submit(self._convert_and_finish, source_path, is_temp, save_path, on_done)
+
+    # ------------------------------------------------------------------
+    # Publikus API
+    # ------------------------------------------------------------------
+    def submit(self, url, save_path, on_done=None):
+        """
+        Kép letöltésének sorba állítása; azonnal visszatér. on_done(ok) a
+        kép elkészülte (vagy hibája) után hívódik, egy háttérszálon.
+        """
+        if url.startswith("//"):
+            url = "https:" + url
+        return self._downloads.submit(self._run, url, save_path, on_done)
+
+    def close(self):
+        """Megvárja az összes függő képet, majd leállítja a workereket."""
+        # Előbb a letöltések (ezek adják fel a konvertálásokat), utána a konvertálás
+        self._downloads.shutdown(wait=True)
+        self._conversions.shutdown(wait=True)
+        self.session.close()
+        print(f"Képek: {self.saved} mentve, {self.failed} hibás")
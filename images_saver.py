@@ -1,31 +1,11 @@
-import pandas as pd
 import os
-import shutil
-from PIL import Image
-
-def standardize_image(img, target_size=(730, 730), background_color=(255, 255, 255)):
-    """
-    Standardizes the given image by fitting it into a fixed-size canvas (target_size).
-    The image is resized to fit within target_size while preserving its aspect ratio,
-    then pasted into the center of a new image of size target_size with the specified background color.
-    """
-    # Convert image to RGB if not already
-    if img.mode != "RGB":
-        img = img.convert("RGB")
-    
-    # Create a new blank image with the target size and background color
-    standardized = Image.new("RGB", target_size, background_color)
-    
-    # Resize the image to fit within target_size while maintaining aspect ratio
-    img.thumbnail(target_size, Image.Resampling.LANCZOS)
-    
-    # Calculate coordinates to center the resized image on the canvas
-    left = (target_size[0] - img.width) // 2
-    top = (target_size[1] - img.height) // 2
-    
-    # Paste the resized image onto the canvas
-    standardized.paste(img, (left, top))
-    return standardized
+import io
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from image_render import render_import_layout
+from image_manifest import ImageManifest
+from artifacts import ArtifactStore, artifact_path
 
 # --- Script Configuration ---
 base_path = r"D:\2022\IT_Rendszerfejlesztes\II_fazis\kiegeszitok_kulacsok"
@@ -34,63 +14,190 @@ base_path = r"D:\2022\IT_Rendszerfejlesztes\II_fazis\kiegeszitok_kulacsok"
 txt_file = os.path.join(base_path, "kulacsok.txt")
 output_dir = os.path.join(base_path, "import_images")
 source_dir = os.path.join(base_path, "images")
+# Source/output hashes of the last run; only new or changed images are re-rendered
+manifest_file = os.path.join(base_path, "import_images_manifest.json")
+# Outputs already rendered by scrape.py (FUSED_IMAGE_PIPELINE), staged by slug
+staging_dir = os.path.join(base_path, "staging")
 
 # Thumbnail sizes
 SMALL_THUMB = (530, 530)
 MEDIUM_THUMB = (530, 530)
 # Main (standardized) image size
 MAIN_IMAGE_SIZE = (530, 530)
+# Canvas colour around the standardized image
+BACKGROUND_COLOR = (255, 255, 255)
 
-# Create the output directory if it doesn't exist
-os.makedirs(output_dir, exist_ok=True)
+# Number of worker processes (1 = process images in this process, one by one)
+WORKERS = os.cpu_count() or 1
 
-# Read the tab-separated text file
-df = pd.read_csv(txt_file, sep='\t')
+# Bump when the rendering itself changes, so every image is rendered again
+RENDER_VERSION = 1
 
-# Process each row in the DataFrame
-for index, row in df.iterrows():
-    # bvin becomes the folder name; image_name is the source filename
-    bvin = str(row['bvin'])
-    image_name = str(row['ImageFileSmall'])  # or row['ImageFileMedium'] if they differ
 
-    # Create the product folder under the output directory
+def render_params():
+    """Everything that affects the rendered outputs (stored in the manifest)."""
+    return {
+        "main": list(MAIN_IMAGE_SIZE),
+        "small": list(SMALL_THUMB),
+        "medium": list(MEDIUM_THUMB),
+        "background": list(BACKGROUND_COLOR),
+        "version": RENDER_VERSION,
+    }
+
+
+def output_paths(bvin, image_name):
+    """Main, small and medium output paths of one image."""
     product_folder = os.path.join(output_dir, bvin)
-    os.makedirs(product_folder, exist_ok=True)
-    
-    # Create 'medium' and 'small' subfolders
-    medium_folder = os.path.join(product_folder, 'medium')
-    small_folder = os.path.join(product_folder, 'small')
-    os.makedirs(medium_folder, exist_ok=True)
-    os.makedirs(small_folder, exist_ok=True)
-    
-    # Full path to the source image
-    source_image_path = os.path.join(source_dir, image_name)
-    
-    if os.path.exists(source_image_path):
-        # Copy the original image into the product folder
-        dest_image_path = os.path.join(product_folder, image_name)
-        shutil.copy2(source_image_path, dest_image_path)
-        
-        # Open the copied image, standardize it to a larger canvas, and overwrite
-        with Image.open(dest_image_path) as img:
-            # Create the standardized main image
-            std_img = standardize_image(img, target_size=MAIN_IMAGE_SIZE)
-            std_img.save(dest_image_path)  # Overwrite the main image in the product folder
-            
-            # Create a small thumbnail from the standardized main image
-            img_small = std_img.copy()
-            img_small.thumbnail(SMALL_THUMB, Image.Resampling.LANCZOS)
-            small_save_path = os.path.join(small_folder, image_name)
-            img_small.save(small_save_path)
-            
-            # Create a medium thumbnail from the standardized main image
-            img_medium = std_img.copy()
-            img_medium.thumbnail(MEDIUM_THUMB, Image.Resampling.LANCZOS)
-            medium_save_path = os.path.join(medium_folder, image_name)
-            img_medium.save(medium_save_path)
-        
-        print(f"Processed: {bvin} - {image_name}")
-    else:
-        print(f"Image not found: {source_image_path}")
-
-print("Processing complete!")
+    return (
+        os.path.join(product_folder, image_name),
+        os.path.join(product_folder, 'small', image_name),
+        os.path.join(product_folder, 'medium', image_name),
+    )
+
+
+def process_image(bvin, image_name):
+    """
+    Builds the bvin/, bvin/small/ and bvin/medium/ outputs for one image.
+    Returns (status, message, manifest_data) where status is "ok", "missing"
+    or "error"; errors are caught here so one broken image does not stop the
+    batch. manifest_data is (source, outputs) for ImageManifest.record.
+    """
+    try:
+        # Full path to the source image
+        source_image_path = os.path.join(source_dir, image_name)
+
+        if not os.path.exists(source_image_path):
+            return "missing", f"Image not found: {source_image_path}", None
+
+        # Read the source once: for the manifest hash and for decoding
+        st = os.stat(source_image_path)
+        with open(source_image_path, "rb") as f:
+            data = f.read()
+        source = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+
+        # Decode the source once and write the main, small and medium images directly
+        outputs = render_import_layout(
+            io.BytesIO(data),
+            os.path.join(output_dir, bvin),
+            image_name,
+            MAIN_IMAGE_SIZE,
+            SMALL_THUMB,
+            MEDIUM_THUMB,
+            background_color=BACKGROUND_COLOR,
+        )
+
+        return "ok", f"Processed: {bvin} - {image_name}", (source, outputs)
+    except Exception as e:
+        return "error", f"Error processing {bvin} - {image_name}: {e}", None
+
+
+def staged_images():
+    """{image_name: staged product folder} of the images rendered during the scrape."""
+    staged = {}
+    if not os.path.isdir(staging_dir):
+        return staged
+    for slug in os.listdir(staging_dir):
+        folder = os.path.join(staging_dir, slug)
+        if not os.path.isdir(folder):
+            continue
+        for name in os.listdir(folder):
+            if os.path.isfile(os.path.join(folder, name)) and not name.endswith(".part"):
+                staged[name] = folder
+    return staged
+
+
+def promote_staged(staged_folder, bvin, image_name):
+    """Moves the staged main/small/medium outputs into import_images/<bvin>/ (no re-encode)."""
+    staged_paths = (
+        os.path.join(staged_folder, image_name),
+        os.path.join(staged_folder, 'small', image_name),
+        os.path.join(staged_folder, 'medium', image_name),
+    )
+    for src_path, dest_path in zip(staged_paths, output_paths(bvin, image_name)):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        os.replace(src_path, dest_path)
+    # Remove the now empty staging folders
+    for folder in (os.path.join(staged_folder, 'small'), os.path.join(staged_folder, 'medium'), staged_folder):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+
+
+def main():
+    # Create the output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Read the tab-separated text file (cached in pipeline.sqlite, headers lowercased)
+    store = ArtifactStore(artifact_path(base_path))
+    df = store.load_export('product_images', txt_file)
+    store.close()
+
+    # bvin becomes the folder name; image_name is the source filename
+    # (or imagefilemedium if they differ)
+    all_jobs = [(str(bvin), str(image_name)) for bvin, image_name in zip(df['bvin'], df['imagefilesmall'])]
+
+    counts = {"ok": 0, "missing": 0, "error": 0, "unchanged": 0, "promoted": 0}
+    start = time.perf_counter()
+
+    # Images already rendered during the scrape only have to be moved in place;
+    # skip images whose source, render parameters and outputs are unchanged
+    staged = staged_images()
+    manifest = ImageManifest(manifest_file, output_dir)
+    params = render_params()
+    jobs = []
+    for bvin, image_name in all_jobs:
+        source_image_path = os.path.join(source_dir, image_name)
+        outputs = output_paths(bvin, image_name)
+        if image_name in staged:
+            promote_staged(staged.pop(image_name), bvin, image_name)
+            counts["promoted"] += 1
+        elif os.path.exists(source_image_path):
+            if manifest.is_current(f"{bvin}/{image_name}", source_image_path, params, outputs):
+                counts["unchanged"] += 1
+            else:
+                jobs.append((bvin, image_name))
+        elif all(os.path.exists(path) for path in outputs):
+            # Promoted from the staging area in an earlier run
+            counts["unchanged"] += 1
+        else:
+            jobs.append((bvin, image_name))
+    print(f"{counts['promoted']} promoted from staging, {counts['unchanged']} unchanged, {len(jobs)} to render")
+
+    def handle(job, result):
+        status, message, manifest_data = result
+        counts[status] += 1
+        print(message)
+        if manifest_data is not None:
+            manifest.record(f"{job[0]}/{job[1]}", manifest_data[0], params, manifest_data[1])
+            if counts["ok"] % 100 == 0:
+                manifest.save()
+
+    try:
+        if WORKERS > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=WORKERS) as executor:
+                results = executor.map(process_image, *zip(*jobs), chunksize=8)
+                for job, result in zip(jobs, results):
+                    handle(job, result)
+        else:
+            for bvin, image_name in jobs:
+                handle((bvin, image_name), process_image(bvin, image_name))
+    finally:
+        manifest.save()
+
+    elapsed = time.perf_counter() - start
+    rate = counts["ok"] / elapsed if elapsed > 0 else 0.0
+    print("Processing complete!")
+    print(
+        f"{counts['ok']} processed, {counts['promoted']} promoted, {counts['unchanged']} unchanged, "
+        f"{counts['missing']} missing, "
+        f"{counts['error']} failed in {elapsed:.1f}s ({rate:.1f} images/sec, {WORKERS} worker(s))"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# ----------------------------------------------------------------------------
+# Termelő/fogyasztó pipeline a letöltés és a parse szétválasztásához.
+# A termelők (HTTP fetcher, böngésző workerek) a nyers HTML-t put()-tal adják
+# át; a parse egy process poolban fut (minden magon), az eredményeket a hívó
+# szál kapja meg, a befejezés sorrendjében.
+# A sor korlátos: legfeljebb queue_size feladat lehet úton (várakozik, parse
+# alatt van, vagy az eredménye még nincs elvéve). Ha megtelt, a put() blokkol,
+# így a letöltés lelassul a parse / feldolgozás tempójára (backpressure), és
+# a memóriában tartott HTML mennyisége is korlátos marad.
+# Ha egy parse processz elhal (a pool "broken" lesz), a pool újraindul; az
+# éppen úton lévő feladatok hibásként (None) jönnek vissza, a többi fut tovább.
+# ----------------------------------------------------------------------------
+
+_END = object()
+
+
+class ParsePipeline:
+    def __init__(self, func, workers=None, queue_size=64):
+        """
+        func(job): a parse worker, modul szintű (pickle-elhető) függvény.
+        workers: processzek száma (None = a magok száma).
+        """
+        self.func = func
+        self.workers = workers
+        self.queue_size = max(1, queue_size)
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._restart_lock = threading.Lock()
+        self.jobs = 0
+        self.failed = 0
+        self.restarts = 0      # a pool ennyiszer indult újra elhalt processz miatt
+        self.blocked = 0.0     # a termelők ennyi időt vártak a teli sorra (mp)
+
+    def _restart(self, broken):
+        """Az elhalt pool cseréje (egyszer, akárhány szál észleli); az aktuális pool."""
+        with self._restart_lock:
+            if self._executor is broken:
+                print("A parse process pool leállt, újraindítás")
+                broken.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self.restarts += 1
+            return self._executor
+
+    def _submit(self, job):
+        executor = self._executor
+        try:
+            return executor, executor.submit(self.func, job)
+        except BrokenProcessPool:
+            executor = self._restart(executor)
+            return executor, executor.submit(self.func, job)
+
+    def run(self, produce):
+        """
+        produce(put) egy háttérszálon fut (maga is indíthat további szálakat);
+        put(key, job) egy feladatot ad a poolnak. Generátor: (key, eredmény)
+        párok a befejezés sorrendjében; hibás feladatnál az eredmény None.
+        Ha a produce kivételt dob, az addig kész eredmények után továbbadódik
+        (a még úton lévő feladatok eredménye elvész).
+        """
+        slots = threading.BoundedSemaphore(self.queue_size)
+        done = queue.Queue()
+        lock = threading.Lock()
+        submitted = [0]
+        error = []
+
+        def put(key, job):
+            started = time.monotonic()
+            slots.acquire()
+            waited = time.monotonic() - started
+            try:
+                executor, future = self._submit(job)
+            except BaseException:
+                slots.release()
+                raise
+            # Csak a ténylegesen beadott feladat számít (a fogyasztó ennyit vár)
+            with lock:
+                submitted[0] += 1
+                self.blocked += waited
+            future.add_done_callback(lambda f: done.put((key, executor, f)))
+
+        def producer():
+            try:
+                produce(put)
+            except BaseException as e:
+                error.append(e)
+            finally:
+                done.put(_END)
+
+        thread = threading.Thread(target=producer, name="parse-producer", daemon=True)
+        thread.start()
+
+        received = 0
+        finished = False
+        while not finished or received < submitted[0]:
+            item = done.get()
+            if item is _END:
+                finished = True
+                if error:
+                    break
+                continue
+            key, executor, future = item
+            received += 1
+            slots.release()
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                self._restart(executor)
+                print("Parse hiba (a parse processz leállt):", key)
+                self.failed += 1
+                result = None
+            except Exception as e:
+                print("Parse hiba:", key, e)
+                self.failed += 1
+                result = None
+            self.jobs += 1
+            yield key, result
+        thread.join()
+        if error:
+            raise error[0]
+
+    def report(self):
+        print(
+            f"Parse pipeline: {self.jobs} oldal ({self.failed} hibás, {self.restarts} pool újraindítás), "
+            f"a letöltés {self.blocked:.1f} mp-et várt a teli sorra (queue_size={self.queue_size})"
+        )
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,176 @@
+import random
+from extraction import extract_product
+from property_catalog import apply_aliases
+
+# ----------------------------------------------------------------------------
+# A Main és a property sorok felépítése a kinyert termékoldal mezőkből.
+# Külön modulban, hogy a scrape.py parse workerei (külön processzek) a
+# böngésző és a közös erőforrások nélkül importálhassák. A workerek csak
+# pickle-elhető adatot kapnak: a nyers HTML-t, a termék listaoldali adatait
+# és a kategória beállításait (a property katalógus aliasaival együtt).
+# ----------------------------------------------------------------------------
+
+# Ezek a fix oszlopnevek a bringaland_hotcakes_import_tisztitott_main.xlsx-ben:
+MAIN_HEADERS = [
+    "SLUG",
+    "Active",
+    "Featured",
+    "SKU",
+    "Name",
+    "Product Type",
+    "MSRP",
+    "Cost",
+    "Price",
+    "Manufacturer",
+    "Vendor",
+    "Image",
+    "Description",
+    "Search Keywords",
+    "Meta Title",
+    "Meta Description",
+    "Meta Keywords",
+    "Tax Schedule",
+    "Tax Exempt",
+    "Weight",
+    "Length",
+    "Width",
+    "Height",
+    "Extra Ship Fee",
+    "Ship Mode",
+    "Non-Shipping Product",
+    "Ships in a Separate Box",
+    "Allow Reviews",
+    "Minimum Qty",
+    "Inventory Mode",
+    "Inventory",
+    "Stock Out at",
+    "Low Stock at",
+    "Roles",
+    "Searchable",
+    "AllowUpcharge",
+    "UpchargeAmount",
+    "UpchargeUnit",
+]
+
+# Ezek a fix oszlopnevek a bringaland_hotcakes_import_tisztitott_property.xlsx-ben:
+PROPERTY_HEADERS = [
+    "PRODUCT SLUG",
+    "Property Name",
+    "Value",
+]
+
+
+def row_settings(aliases, default_manufacturers, fixed_properties):
+    """A kategória sorépítési beállításai (a parse workereknek átadható dict)."""
+    return {
+        "aliases": dict(aliases),
+        "default_manufacturers": list(default_manufacturers),
+        "fixed_properties": [tuple(item) for item in fixed_properties],
+    }
+
+
+def product_page_complete(fields):
+    """Igaz, ha a kinyert mezők között már ott a paramétertábla és a leírás."""
+    return fields["params"] is not None and fields["description"] is not None
+
+
+def build_product_rows(settings, slug_str, image_name, product_name, price, fields):
+    """(main_row, product_property_rows, image_url) a kinyert mezőkből."""
+    # Tulajdonságok kinyerése
+    found_props = {}
+    for key, val in fields["params"] or []:
+        # Egységes név a katalógus aliasai szerint (pl. "Színválaszték" -> "Szín")
+        key = apply_aliases(settings["aliases"], key)
+        found_props[key] = val
+
+    # Gyártó
+    manufacturer = found_props.get("Gyártó")
+    if not manufacturer:
+        manufacturer = random.choice(settings["default_manufacturers"])
+    found_props["Gyártó"] = manufacturer
+
+    # Fix property
+    for if_missing, prop_name, prop_value in settings["fixed_properties"]:
+        if if_missing not in found_props:
+            found_props[prop_name] = prop_value
+
+    # Leírás és az első kép (a séma fallbackjeivel)
+    full_description = fields["description"] or ""
+    image_url = fields["image_url"] or ""
+
+    # ----------------------------------------------------------------------------
+    # MAIN SHEET FELÉPÍTÉSE
+    # ----------------------------------------------------------------------------
+    # A sample “main” oszlopok kitöltése (SLUG, Name, Price, Manufacturer, stb.)
+    # A hiányzókat default értékre állítjuk (pl. 0 Ft, NO, YES, stb.)
+
+    main_row = {
+        "SLUG": slug_str,
+        "Active": "YES",
+        "Featured": "NO",
+        "SKU": slug_str.upper(),
+        "Name": product_name,
+        "Product Type": "",
+        "MSRP": "0,00 Ft",
+        "Cost": "0,00 Ft",
+        "Price": price if price else "0 Ft",
+        "Manufacturer": manufacturer,
+        "Vendor": "",
+        "Image": image_name,  # pl. "product_image_ruha_1.jpg"
+        "Description": full_description,
+        "Search Keywords": "",
+        "Meta Title": "",
+        "Meta Description": "",
+        "Meta Keywords": "",
+        "Tax Schedule": "",
+        "Tax Exempt": "NO",
+        "Weight": "0,0000000000",
+        "Length": "0,0000000000",
+        "Width": "0,0000000000",
+        "Height": "0,0000000000",
+        "Extra Ship Fee": "0,00 Ft",
+        "Ship Mode": "ShipFromSite",
+        "Non-Shipping Product": "NO",
+        "Ships in a Separate Box": "NO",
+        "Allow Reviews": "YES",
+        "Minimum Qty": "0",
+        "Inventory Mode": "AlwayInStock",
+        "Inventory": "0",
+        "Stock Out at": "0",
+        "Low Stock at": "0",
+        "Roles": "",
+        "Searchable": "YES",
+        "AllowUpcharge": "NO",
+        "UpchargeAmount": "0,0000000000",
+        "UpchargeUnit": "1",
+    }
+
+    # ----------------------------------------------------------------------------
+    # PROPERTY SHEET FELÉPÍTÉSE
+    # ----------------------------------------------------------------------------
+    # A property Excel-ben a “PRODUCT SLUG” oszlopban csak az első tulajdonságsornál
+    # tüntetjük fel az adott SLUG-ot, utána üres marad (lásd a felhasználó kérése).
+    # A "Gyártó" a Main sheetre kerül, itt kimarad.
+    product_property_rows = []
+    for prop_name, prop_value in found_props.items():
+        if prop_name != "Gyártó":
+            product_property_rows.append({
+                "PRODUCT SLUG": "" if product_property_rows else slug_str,
+                "Property Name": prop_name,
+                "Value": prop_value,
+            })
+
+    return main_row, product_property_rows, image_url
+
+
+def parse_product(job):
+    """
+    Parse worker: job = (html, require_complete, settings, (slug, képnév, név, ár)).
+    Visszatérés: (main_row, product_property_rows, image_url), vagy None, ha
+    require_complete mellett az oldalból hiányzik a paramétertábla / leírás.
+    """
+    html, require_complete, settings, (slug_str, image_name, product_name, price) = job
+    fields = extract_product(html)
+    if require_complete and not product_page_complete(fields):
+        return None
+    return build_product_rows(settings, slug_str, image_name, product_name, price, fields)
@@ -0,0 +1,153 @@
+import os
+import sqlite3
+
+# ------------------------------------------------------------------------------
+# Persistent property catalog shared by all categories (one SQLite file next
+# to the category folders). Every stage resolves property names through it:
+#
+#   scrape.py                        intern(): aliases -> canonical name
+#   generate_new_property_inserts    db_name(): canonical name + category suffix
+#   generate_*_translation / values  db_id(): canonical name -> hcc_ProductProperty.Id
+#
+# The category is the suffix the properties get in the database (the
+# GLOBAL_CATEGORY of the generator scripts, e.g. "_kiegeszitok_kulacsok").
+# Database ids are recorded once (import_db_ids, from the TXT export or from
+# db_sink.lookups()) and then reused instead of rebuilding the mapping.
+# Everything is loaded into dicts on open, so lookups are O(1).
+# ------------------------------------------------------------------------------
+
+CATALOG_FILE_NAME = "property_catalog.sqlite"
+
+# Alias -> canonical name, valid in every category (seeded on first open)
+DEFAULT_ALIASES = {
+    "Színválaszték": "Szín",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS properties (
+    category TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    db_id    INTEGER,
+    PRIMARY KEY (category, name)
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    category TEXT NOT NULL,  -- '' = every category
+    alias    TEXT NOT NULL,  -- stored lower-case
+    name     TEXT NOT NULL,
+    PRIMARY KEY (category, alias)
+);
+"""
+
+
+def catalog_path(folder):
+    return os.path.join(folder, CATALOG_FILE_NAME)
+
+
+def apply_aliases(aliases, name):
+    """canonical() with an alias_map() snapshot, for processes without the catalog."""
+    name = name.strip()
+    return aliases.get(name.lower(), name)
+
+
+class PropertyCatalog:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        if self.conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0] == 0:
+            self.conn.executemany(
+                "INSERT INTO aliases (category, alias, name) VALUES ('', ?, ?)",
+                [(alias.lower(), name) for alias, name in DEFAULT_ALIASES.items()],
+            )
+        self.conn.commit()
+
+        # (category, name) -> db_id or None
+        self._properties = {
+            (category, name): db_id
+            for category, name, db_id in self.conn.execute("SELECT category, name, db_id FROM properties")
+        }
+        # (category, lower-case alias) -> name
+        self._aliases = {
+            (category, alias): name
+            for category, alias, name in self.conn.execute("SELECT category, alias, name FROM aliases")
+        }
+
+    # --------------------------------------------------------------------------
+    # Names
+    # --------------------------------------------------------------------------
+    def canonical(self, category, name):
+        """The catalog name for a scraped/exported name (whitespace stripped, aliases applied)."""
+        name = name.strip()
+        key = name.lower()
+        return self._aliases.get((category, key)) or self._aliases.get(("", key)) or name
+
+    def intern(self, category, name):
+        """canonical() and remember the name in the category; returns the canonical name."""
+        name = self.canonical(category, name)
+        if (category, name) not in self._properties:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO properties (category, name) VALUES (?, ?)", (category, name)
+                )
+            self._properties[(category, name)] = None
+        return name
+
+    def alias_map(self, category):
+        """{lower-case alias: name} valid in the category (category aliases win)."""
+        aliases = {alias: name for (cat, alias), name in self._aliases.items() if cat == ""}
+        aliases.update((alias, name) for (cat, alias), name in self._aliases.items() if cat == category)
+        return aliases
+
+    def db_name(self, category, name):
+        """PropertyName in hcc_ProductProperty: canonical name + category suffix."""
+        return f"{self.canonical(category, name)}{category}"
+
+    # --------------------------------------------------------------------------
+    # Database ids
+    # --------------------------------------------------------------------------
+    def db_id(self, category, name):
+        """hcc_ProductProperty.Id of the property, or None if not known yet."""
+        return self._properties.get((category, self.canonical(category, name)))
+
+    def db_ids(self, category):
+        """{canonical name: Id} for the properties of the category that have an id."""
+        return {name: db_id for (cat, name), db_id in self._properties.items()
+                if cat == category and db_id is not None}
+
+    def missing_db_ids(self, category):
+        return sorted(name for (cat, name), db_id in self._properties.items()
+                      if cat == category and db_id is None)
+
+    def import_db_ids(self, category, pairs):
+        """
+        Records ids from (PropertyName, Id) pairs as they are in the database
+        (with the category suffix). Names of other categories are ignored.
+        Returns the number of names recorded.
+        """
+        rows = []
+        for db_name, db_id in pairs:
+            if db_name is None or db_id is None or db_id != db_id:  # db_id != db_id: NaN
+                continue
+            db_name = str(db_name).strip()
+            if not db_name.endswith(category):
+                continue
+            name = self.canonical(category, db_name[: len(db_name) - len(category)])
+            rows.append((category, name, int(db_id)))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO properties (category, name, db_id) VALUES (?, ?, ?) "
+                "ON CONFLICT (category, name) DO UPDATE SET db_id = excluded.db_id",
+                rows,
+            )
+        for _, name, db_id in rows:
+            self._properties[(category, name)] = db_id
+        return len(rows)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
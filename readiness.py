@@ -0,0 +1,167 @@
+import csv
+import time
+import threading
+from collections import defaultdict
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# ----------------------------------------------------------------------------
+# Oldal-készenléti feltételek a fix time.sleep() hívások helyett.
+# Minden várakozás konkrét DOM feltételre vár, időkorláttal, és rögzíti,
+# hogy ténylegesen mennyi ideig tartott -> a timeoutok mért adatból hangolhatók.
+# ----------------------------------------------------------------------------
+
+class WaitStats:
+    """Várakozási idők gyűjtése név szerint (szálbiztos, a driver pool miatt)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(list)   # name -> [(seconds, ok), ...]
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            self._samples[name].append((seconds, ok))
+
+    def summary(self):
+        """Soronként: név, darab, timeoutok, átlag, p50, p95, max (mp)."""
+        lines = []
+        with self._lock:
+            items = sorted(self._samples.items())
+        for name, samples in items:
+            durations = sorted(s for s, _ in samples)
+            timeouts = sum(1 for _, ok in samples if not ok)
+            n = len(durations)
+            p50 = durations[n // 2]
+            p95 = durations[min(n - 1, int(n * 0.95))]
+            lines.append(
+                f"{name}: n={n}, timeout={timeouts}, "
+                f"átlag={sum(durations) / n:.2f}s, p50={p50:.2f}s, "
+                f"p95={p95:.2f}s, max={durations[-1]:.2f}s"
+            )
+        return lines
+
+    def print_summary(self):
+        print("Várakozási statisztika:")
+        for line in self.summary():
+            print(f"  {line}")
+
+    def save_csv(self, path):
+        """Az összes nyers mérés kiírása (name, seconds, ok) a hangoláshoz."""
+        with self._lock:
+            items = sorted(self._samples.items())
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "seconds", "ok"])
+            for name, samples in items:
+                for seconds, ok in samples:
+                    writer.writerow([name, f"{seconds:.3f}", int(ok)])
+
+
+STATS = WaitStats()
+
+
+def wait_until(driver, condition, timeout, name, poll=0.1, stats=STATS):
+    """
+    Vár, amíg a condition(driver) igaz értéket ad, legfeljebb `timeout` mp-ig.
+    Timeout esetén None-t ad vissza (nem dob kivételt), az időt mindkét
+    esetben rögzíti `name` alatt.
+    """
+    start = time.perf_counter()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+        ok = True
+    except TimeoutException:
+        result = None
+        ok = False
+    stats.record(name, time.perf_counter() - start, ok)
+    return result
+
+
+# ----------------------------------------------------------------------------
+# Feltételek
+# ----------------------------------------------------------------------------
+
+def element_present(css):
+    """Legalább egy elem illeszkedik a CSS szelektorra."""
+    def condition(driver):
+        return driver.find_elements(By.CSS_SELECTOR, css) or False
+    return condition
+
+
+def element_text_present(css):
+    """Van olyan illeszkedő elem, aminek nem üres a szöveges tartalma."""
+    def condition(driver):
+        for el in driver.find_elements(By.CSS_SELECTOR, css):
+            try:
+                if (el.get_attribute("textContent") or "").strip():
+                    return el
+            except WebDriverException:
+                continue
+        return False
+    return condition
+
+
+def element_clickable(css):
+    """Az első illeszkedő elem, ami látható és engedélyezett (kattintható)."""
+    def condition(driver):
+        for el in driver.find_elements(By.CSS_SELECTOR, css):
+            try:
+                if el.is_displayed() and el.is_enabled():
+                    return el
+            except WebDriverException:
+                continue
+        return False
+    return condition
+
+
+def any_condition(*conditions):
+    """Az első teljesülő feltétel eredménye."""
+    def condition(driver):
+        for c in conditions:
+            result = c(driver)
+            if result:
+                return result
+        return False
+    return condition
+
+
+def element_count_at_least(css, count):
+    """Legalább `count` elem illeszkedik; visszatérés: a tényleges darabszám."""
+    def condition(driver):
+        found = len(driver.find_elements(By.CSS_SELECTOR, css))
+        return found if found >= count else False
+    return condition
+
+
+class element_count_stable:
+    """
+    Az illeszkedő elemek száma legalább `minimum`, és `settle` mp óta nem
+    változott. Visszatérés: az elemek száma.
+    """
+
+    def __init__(self, css, settle=1.0, minimum=1):
+        self.css = css
+        self.settle = settle
+        self.minimum = minimum
+        self._count = None
+        self._since = None
+
+    def __call__(self, driver):
+        count = len(driver.find_elements(By.CSS_SELECTOR, self.css))
+        now = time.monotonic()
+        if count != self._count:
+            self._count = count
+            self._since = now
+            return False
+        if count >= self.minimum and now - self._since >= self.settle:
+            return count
+        return False
+
+
+def scroll_height_changed(previous_height):
+    """A document.body.scrollHeight eltér a korábbitól; visszatérés: az új érték."""
+    def condition(driver):
+        height = driver.execute_script("return document.body.scrollHeight")
+        return height if height != previous_height else False
+    return condition
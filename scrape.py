@@ -1,332 +1,728 @@
 import os
-import re
+import json
 import time
-import random
-import requests
-import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from PIL import Image
-import io
+from urllib.parse import urljoin
+from selenium.common.exceptions import WebDriverException
+from fetcher import fetch_all
+from driver_pool import DriverPool, chrome_driver
+import readiness
+from readiness import wait_until
+from extraction import LISTING_SCHEMA, listing_pagination
+from checkpoint import CheckpointStore
+from excel_stream import StreamingSheetWriter
+from artifacts import ArtifactStore, artifact_path
+from property_catalog import PropertyCatalog, catalog_path
+from http_cache import HttpCache
+from crawl_scheduler import CrawlScheduler
+from image_pipeline import ImageDownloader
+from image_render import render_import_layout
+from images_saver import MAIN_IMAGE_SIZE, SMALL_THUMB, MEDIUM_THUMB, BACKGROUND_COLOR
+from parse_pipeline import ParsePipeline
+from product_rows import MAIN_HEADERS, PROPERTY_HEADERS, parse_product, row_settings
+from work_queue import SqliteWorkQueue, serve_queue
 
 # ----------------------------------------------------------------------------
 # 1) PROJECT & FOLDER SETTINGS
 # ----------------------------------------------------------------------------
 project_folder = r"D:\2022\IT_Rendszerfejlesztes\II_fazis"
-mentes_folder = os.path.join(project_folder, "kiegeszitok_kulacsok")
-os.makedirs(project_folder, exist_ok=True)
 
-# Az új image folder: basepath + "\ruhak\images"
-image_folder = os.path.join(project_folder, "kiegeszitok_kulacsok", "images")
-os.makedirs(image_folder, exist_ok=True)
+# Kategóriánként a project_folder alatt egy mappa (a kategória neve), benne:
+#   images/                    letöltött képek ("\kiegeszitok_kulacsok\images")
+#   staging/                   összevont képfeldolgozás kimenete, SLUG szerint
+#   scrape_checkpoint.sqlite   checkpoint: egy megszakadt futás innen folytatódik
+#                              (törlése = tiszta újrakezdés)
+#   pipeline.sqlite, *.xlsx    a kinyert termékek és tulajdonságok
+
+# Összevont képfeldolgozás: a letöltött képből rögtön a végleges main/small/medium
+# képek készülnek (images_saver.py méreteivel), SLUG szerint a staging mappában.
+# Az images_saver.py a bvin-ek ismeretében már csak a helyükre mozgatja őket.
+FUSED_IMAGE_PIPELINE = False
+
+# A termékek és tulajdonságok a pipeline.sqlite-ba kerülnek (ebből dolgoznak a
+# generate_*.py scriptek); a property xlsx csak kérésre készül, ellenőrzéshez.
+WRITE_PROPERTY_XLSX = False
+
+# Lemezes HTTP cache (oldalak + képek), a kategóriák között közös
+cache_folder = os.path.join(project_folder, "http_cache")
+HTTP_CACHE_MAX_BYTES = 2 * 1024 ** 3   # 2 GB felett LRU törlés
 
 # ----------------------------------------------------------------------------
 # 2) SITE SETTINGS
 # ----------------------------------------------------------------------------
-base_url = "https://bikepro.hu/kerekpar_kiegeszitok/kulacs_kulacstarto_329/kulacs_486"
-total_pages = 6  # szükség szerint módosítsd
+# Batch mód: a kategóriák listája egy JSON manifestben, pl.
+#   [
+#     {"name": "kiegeszitok_kulacsok", "base_url": "https://bikepro.hu/.../kulacs_486",
+#      "slug_prefix": "kit", "image_prefix": "product_image_alkouv_",
+#      "property_category": "_kiegeszitok_kulacsok"},
+#     {"name": "vazak", "base_url": "https://bikepro.hu/...", "slug_prefix": "vaz",
+#      "image_prefix": "product_image_vaz_", "property_category": "_vazak",
+#      "fixed_properties": []}
+#   ]
+# A hiányzó kulcsok a DEFAULT_CATEGORY értékei. Ha nincs manifest, csak a
+# DEFAULT_CATEGORY fut (az eddigi egykategóriás működés).
+# Egy futásban a böngésző pool, a HTTP cache, az ütemező, a képletöltő és a
+# property katalógus közös. Egy termék (URL) több kategóriában is szerepelhet:
+# a manifest sorrendjében első kategóriához kerül, a többi kihagyja, így
+# minden termékoldal és kép egyszer töltődik le (category_duplicates.tsv).
+CATEGORY_MANIFEST = os.path.join(project_folder, "categories.json")
+
+DEFAULT_CATEGORY = {
+    # Mappanév a project_folder alatt
+    "name": "kiegeszitok_kulacsok",
+    "base_url": "https://bikepro.hu/kerekpar_kiegeszitok/kulacs_kulacstarto_329/kulacs_486",
+    # Listaoldalak száma; None = automatikusan, az első listaoldal lapozójából
+    # (és a további oldalak lapozóiból, ha az nem mutatja az utolsó oldalt)
+    "total_pages": None,
+    # SLUG: prefix + 4 jegyű sorszám (pl. kit0001), kép: prefix + sorszám + .jpg
+    "slug_prefix": "kit",
+    "image_prefix": "product_image_alkouv_",
+    # Property katalógus kategória (a kategóriák között közös katalógus): a
+    # generate_*.py scriptek GLOBAL_CATEGORY utótagja
+    "property_category": "_kiegeszitok_kulacsok",
+    # Gyártó, ha az oldalon nincs megadva (véletlenszerűen választva)
+    "default_manufacturers": ["Acor", "Laken", "SKS", "Bikefun"],
+    # Fix property-k: [ha hiányzik, beállítandó név, érték]
+    "fixed_properties": [
+        ["Alapanyag", "Vázméret", "Műanyag"],
+        ["Űrtartalom", "Űrtartalom", "0,75 Liter"],
+    ],
+}
+
+# Termékoldalak közvetlen HTTP letöltése (Selenium csak tartalékként)
+USE_HTTP_FETCH = True
+HTTP_CONCURRENCY = 8   # egyszerre futó kérések száma
+HTTP_TIMEOUT = 15      # másodperc / oldal
+
+# A termékoldalak parse-a és a sorok építése külön processzekben, a letöltéssel
+# párhuzamosan; a letöltők legfeljebb PARSE_QUEUE_SIZE oldallal járhatnak előrébb
+PARSE_WORKERS = os.cpu_count() or 1
+PARSE_QUEUE_SIZE = 64
+# A kiírás a listázási sorrendben halad; a sorrendre váró kész termékek közül
+# legfeljebb ennyi marad memóriában, a többi a checkpointból töltődik vissza,
+# amikor sorra kerül (pl. ha egy korai termék a böngészős tartalékra vár)
+REORDER_BUFFER = 256
+
+# Elosztott mód: a termékoldalakat a scrape_worker.py processzek töltik le és
+# dolgozzák fel (akár több gépen, mindegyik a saját böngészőivel), egy közös,
+# bérletes munkasorból (work_queue.py). Ez a script a koordinátor: a
+# listaoldalakat ő járja be, ő osztja ki a SLUG-okat (a checkpoint sorszámai
+# szerint, a workerek csak továbbviszik őket), és ő menti a workerek által
+# visszaadott sorokat és tölti le a képeket.
+DISTRIBUTED = False
+work_queue_path = os.path.join(project_folder, "work_queue.sqlite")
+# (host, port), ha más gépeken futó workerek is csatlakoznak (tcp://host:port),
+# pl. ("0.0.0.0", 50000); None = csak ezen a gépen (sqlite:///<work_queue_path>)
+WORK_QUEUE_LISTEN = None
+# A TCP kiszolgáláshoz kötelező (nincs alapértelmezett kulcs)
+WORK_QUEUE_AUTHKEY = os.environ["SCRAPE_QUEUE_KEY"].encode() if os.environ.get("SCRAPE_QUEUE_KEY") else None
+WORK_QUEUE_POLL = 1.0   # mp, az eredmények lekérdezése között
+WORK_QUEUE_STATUS_EVERY = 60     # mp, ilyen időközönként "várakozás a workerekre" állapotsor
+WORK_QUEUE_TIMEOUT = 3600        # mp eredmény nélkül, utána a köteg maradéka kimarad (0 = nincs korlát)
+
+# Képletöltés a háttérben, a scrape-pel párhuzamosan
+IMAGE_DOWNLOAD_WORKERS = 8
+IMAGE_CONVERT_WORKERS = 2
+
+# Hostonkénti önhangoló keret (AIMD), a fetcher és a képletöltő között közös:
+# induló / maximális párhuzamosság és kérés/mp; 429/5xx vagy lassulás esetén
+# feleződik, hibátlan válaszoknál lassan nő
+SCHEDULER_INITIAL_CONCURRENCY = 4
+SCHEDULER_MAX_CONCURRENCY = 16
+SCHEDULER_INITIAL_RATE = 8.0
+SCHEDULER_MAX_RATE = 50.0
 
 # ----------------------------------------------------------------------------
 # 3) SELENIUM SETUP
 # ----------------------------------------------------------------------------
-service = Service()
-options = webdriver.ChromeOptions()
-# options.add_argument('--headless')
-driver = webdriver.Chrome(service=service, options=options)
+BROWSER_WORKERS = 4    # párhuzamos böngészők száma
+HEADLESS = False
+
+# Várakozási időkorlátok (mp) a fix sleep-ek helyett; a futás végén kiírt
+# statisztika (és a waits.csv) alapján hangolhatók.
+LISTING_TIMEOUT = 10       # listaoldal: termékdobozok száma stabilizálódik
+SCROLL_TIMEOUT = 2         # görgetés után: scrollHeight változik
+PRODUCT_TIMEOUT = 5        # termékoldal: paramétertábla / fülek megjelennek
+TAB_TIMEOUT = 3            # fül kattintás után: tartalom megjelenik
+
+PRODUCT_BOX_CSS = "div.product-snapshot.list_div_item"
+PARAM_TABLE_CSS = "table.parameter-table"
+DESC_CSS = "#productdescriptionnoparameters-wrapper span.product-desc"
 
 # ----------------------------------------------------------------------------
 # 4) HELPER FUNCTIONS
 # ----------------------------------------------------------------------------
-def remove_illegal_chars(text):
-    """Törli az Excel számára illegális karaktereket."""
-    ILLEGAL_CHARACTERS_RE = re.compile(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]+')
-    return text if not isinstance(text, str) else ILLEGAL_CHARACTERS_RE.sub("", text)
-
-def download_and_convert_image(url, save_path):
-    """Kép letöltése és JPEG formátumban mentése."""
-    if not url:
+class Category:
+    """Egy kategória beállításai (a manifest egy eleme) és mappái."""
+
+    def __init__(self, settings):
+        settings = {**DEFAULT_CATEGORY, **settings}
+        self.name = settings["name"]
+        self.base_url = settings["base_url"]
+        self.total_pages = settings["total_pages"]
+        self.slug_prefix = settings["slug_prefix"]
+        self.image_prefix = settings["image_prefix"]
+        self.property_category = settings["property_category"]
+        self.default_manufacturers = list(settings["default_manufacturers"])
+        self.fixed_properties = [tuple(item) for item in settings["fixed_properties"]]
+
+        self.folder = os.path.join(project_folder, self.name)
+        self.image_folder = os.path.join(self.folder, "images")
+        self.staging_folder = os.path.join(self.folder, "staging")
+        self.checkpoint_path = os.path.join(self.folder, "scrape_checkpoint.sqlite")
+        self.main_export_path = os.path.join(self.folder, "bikepro_hotcakes_import_tisztitott_main.xlsx")
+        self.property_export_path = os.path.join(self.folder, "bringaland_hotcakes_import_tisztitott_property.xlsx")
+        os.makedirs(self.image_folder, exist_ok=True)
+
+    def listing_page_url(self, page):
+        return self.base_url if page == 1 else f"{self.base_url}?page={page}"
+
+    def slug(self, counter):
+        # SLUG a sorszám alapján (pl. kit0001, kit0002, stb.)
+        return f"{self.slug_prefix}{counter:04d}"
+
+    def image_filename(self, counter):
+        image_name = f"{self.image_prefix}{counter}.jpg"
+        if FUSED_IMAGE_PIPELINE:
+            return os.path.join(self.staging_folder, self.slug(counter), image_name)
+        return os.path.join(self.image_folder, image_name)
+
+
+def load_categories(path=CATEGORY_MANIFEST):
+    """A manifest kategóriái (sorrendben); manifest nélkül csak a DEFAULT_CATEGORY."""
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            categories = [Category(settings) for settings in json.load(f)]
+    else:
+        categories = [Category({})]
+    # A mappák és a SLUG-ok nem ütközhetnek (a SKU a SLUG-ból készül)
+    for attribute in ("name", "slug_prefix"):
+        values = [getattr(category, attribute) for category in categories]
+        duplicates = sorted({value for value in values if values.count(value) > 1})
+        if duplicates:
+            raise ValueError(f"Ismétlődő {attribute} a kategória manifestben: {', '.join(duplicates)}")
+    return categories
+
+
+class FetchContext:
+    """Oldalak letöltése és parse-a: böngésző pool, HTTP cache, ütemező, parse workerek."""
+
+    def __init__(self, cache_folder=cache_folder):
+        self.pool = DriverPool(BROWSER_WORKERS, driver_factory=lambda: chrome_driver(headless=HEADLESS))
+        self.http_cache = HttpCache(cache_folder, max_bytes=HTTP_CACHE_MAX_BYTES)
+        self.scheduler = CrawlScheduler(
+            initial_concurrency=SCHEDULER_INITIAL_CONCURRENCY,
+            max_concurrency=SCHEDULER_MAX_CONCURRENCY,
+            initial_rate=SCHEDULER_INITIAL_RATE,
+            max_rate=SCHEDULER_MAX_RATE,
+        )
+        self.parser = ParsePipeline(parse_product, workers=PARSE_WORKERS, queue_size=PARSE_QUEUE_SIZE)
+
+    def fetch(self, urls, on_page=None):
+        """
+        {url: html vagy None}, HTTP-n párhuzamosan (közös cache és ütemező);
+        on_page megadásával az oldalak érkezéskor annak adódnak át.
+        """
+        return fetch_all(urls, concurrency=HTTP_CONCURRENCY, timeout=HTTP_TIMEOUT,
+                         cache=self.http_cache, scheduler=self.scheduler, on_page=on_page)
+
+    def close(self):
+        self.pool.close()
+        self.parser.close()
+        self.http_cache.close()
+
+
+class CrawlContext(FetchContext):
+    """A futás közös erőforrásai, minden kategóriához ugyanazok (+ képletöltő, katalógus, munkasor)."""
+
+    def __init__(self):
+        # A böngészők indítása előtt: kulcs nélkül a munkasor nem szolgálható ki
+        if DISTRIBUTED and WORK_QUEUE_LISTEN and not WORK_QUEUE_AUTHKEY:
+            raise RuntimeError("WORK_QUEUE_LISTEN mellett a SCRAPE_QUEUE_KEY környezeti változó kötelező")
+        super().__init__()
+        self.images = ImageDownloader(
+            download_workers=IMAGE_DOWNLOAD_WORKERS,
+            convert_workers=IMAGE_CONVERT_WORKERS,
+            cache=self.http_cache,
+            convert=render_staged if FUSED_IMAGE_PIPELINE else None,
+            scheduler=self.scheduler,
+        )
+        self.catalog = PropertyCatalog(catalog_path(project_folder))
+        # Elosztott módban a termékoldalakat a scrape_worker.py workerek dolgozzák fel
+        self.work_queue = None
+        if DISTRIBUTED:
+            self.work_queue = SqliteWorkQueue(work_queue_path)
+            if WORK_QUEUE_LISTEN:
+                serve_queue(self.work_queue, WORK_QUEUE_LISTEN, WORK_QUEUE_AUTHKEY)
+
+    def close(self):
+        """A háttérben futó képletöltések megvárása, majd minden lezárása."""
+        self.images.close()
+        self.catalog.close()
+        if self.work_queue is not None:
+            self.work_queue.close()
+        super().close()
+
+def render_staged(source_path, save_path):
+    """Összevont mód: a végleges import képek renderelése a staging/<slug> mappába."""
+    render_import_layout(
+        source_path,
+        os.path.dirname(save_path),
+        os.path.basename(save_path),
+        MAIN_IMAGE_SIZE,
+        SMALL_THUMB,
+        MEDIUM_THUMB,
+        background_color=BACKGROUND_COLOR,
+    )
+    print(f"Kép renderelve: {save_path}")
+
+def save_product_image(ctx, store, product_url, image_url, save_path):
+    """Kép letöltésének sorba állítása; az állapot a checkpointba kerül, ha elkészült."""
+    if not image_url:
+        store.set_image_status(product_url, "none")
         return
-    if url.startswith("//"):
-        url = "https:" + url
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    ctx.images.submit(
+        image_url,
+        save_path,
+        on_done=lambda ok: store.set_image_status(product_url, "ok" if ok else "failed"),
+    )
+
+def click_tab(driver, tab_id, ready_condition, wait_name):
+    """Egy fül megnyitása és a tartalmára várás; igaz, ha sikerült kattintani."""
+    tab = wait_until(driver, readiness.element_clickable(f"#{tab_id}"), TAB_TIMEOUT, f"{wait_name}_clickable")
+    if tab is None:
+        return False
     try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            try:
-                img = Image.open(io.BytesIO(resp.content)).convert("RGB")
-                img.save(save_path, format="JPEG", quality=90)
-                print(f"Kép letöltve és mentve: {save_path}")
-            except Exception:
-                with open(save_path, "wb") as f:
-                    f.write(resp.content)
-                print(f"Kép mentve (konvertálás nélkül): {save_path}")
-    except Exception as e:
-        print("Error downloading image:", url, e)
+        tab.click()
+    except WebDriverException:
+        return False
+    wait_until(driver, ready_condition, TAB_TIMEOUT, wait_name)
+    return True
 
-# ----------------------------------------------------------------------------
-# 5) TARGET EXCEL STRUCTURES
-# ----------------------------------------------------------------------------
-# Ezek a fix oszlopnevek a bringaland_hotcakes_import_tisztitott_main.xlsx-ben:
-MAIN_HEADERS = [
-    "SLUG",
-    "Active",
-    "Featured",
-    "SKU",
-    "Name",
-    "Product Type",
-    "MSRP",
-    "Cost",
-    "Price",
-    "Manufacturer",
-    "Vendor",
-    "Image",
-    "Description",
-    "Search Keywords",
-    "Meta Title",
-    "Meta Description",
-    "Meta Keywords",
-    "Tax Schedule",
-    "Tax Exempt",
-    "Weight",
-    "Length",
-    "Width",
-    "Height",
-    "Extra Ship Fee",
-    "Ship Mode",
-    "Non-Shipping Product",
-    "Ships in a Separate Box",
-    "Allow Reviews",
-    "Minimum Qty",
-    "Inventory Mode",
-    "Inventory",
-    "Stock Out at",
-    "Low Stock at",
-    "Roles",
-    "Searchable",
-    "AllowUpcharge",
-    "UpchargeAmount",
-    "UpchargeUnit",
-]
-
-# Ezek a fix oszlopnevek a bringaland_hotcakes_import_tisztitott_property.xlsx-ben:
-PROPERTY_HEADERS = [
-    "PRODUCT SLUG",
-    "Property Name",
-    "Value",
-]
+def load_product_html(driver, product_url):
+    """
+    Termékoldal betöltése böngészővel (tartalék út); visszatérés: a nyers HTML,
+    a parse a parse workerekben történik. Fülre csak akkor kattintunk, ha a
+    paramétertábla / leírás nincs a kezdeti DOM-ban.
+    """
+    driver.get(product_url)
+    wait_until(
+        driver,
+        readiness.any_condition(
+            readiness.element_present(PARAM_TABLE_CSS),
+            readiness.element_present("#productparams-tab"),
+        ),
+        PRODUCT_TIMEOUT,
+        "product_page",
+    )
+    if not readiness.element_present(PARAM_TABLE_CSS)(driver):
+        click_tab(driver, "productparams-tab", readiness.element_present(PARAM_TABLE_CSS), "param_tab")
+    if not readiness.element_text_present(DESC_CSS)(driver):
+        click_tab(
+            driver, "productdescriptionnoparameters-tab", readiness.element_text_present(DESC_CSS), "desc_tab"
+        )
+    # A fülek tartalma a DOM-ban marad, így elég egyetlen page_source
+    return driver.page_source
 
-# ----------------------------------------------------------------------------
-# 6) SCRAPE
-# ----------------------------------------------------------------------------
-main_data = []       # A main sheet adatai
-property_data = []   # A property sheet adatai
+def listing_entries(fields, page_url):
+    """A listaoldal termékdobozai: [(url, név, ár), ...]; a relatív linkek a listaoldalhoz képest."""
+    entries = []
+    for box in fields["products"]:
+        product_url = box["url"]
+        if product_url is None:
+            continue
+        if product_url:
+            product_url = urljoin(page_url, product_url)
+        entries.append((product_url, box["name"] or "", box["price"] or ""))
+    return entries
 
-product_counter = 1
+def load_listing_html(driver, page_url):
+    """Listaoldal böngészővel, görgetés nélkül (csak a lapozó felderítéséhez)."""
+    driver.get(page_url)
+    wait_until(driver, readiness.element_present(PRODUCT_BOX_CSS), LISTING_TIMEOUT, "listing_first_box")
+    return driver.page_source
 
-for page in range(1, total_pages + 1):
-    page_url = base_url if page == 1 else f"{base_url}?page={page}"
+def load_listing_page(driver, page_url, expected=None):
+    """
+    Egy listaoldal betöltése, görgetése; visszatérés: [(url, név, ár), ...].
+    Ha ismert a várt termékszám (expected), a görgetés addig tart, amíg
+    ennyi termékdoboz meg nem jelenik; különben amíg az oldal magassága nő.
+    """
     driver.get(page_url)
-    time.sleep(5)
+    if expected:
+        ready = wait_until(
+            driver,
+            readiness.element_count_at_least(PRODUCT_BOX_CSS, expected),
+            LISTING_TIMEOUT,
+            "listing_boxes_expected",
+        )
+    else:
+        ready = None
+        wait_until(
+            driver,
+            readiness.element_count_stable(PRODUCT_BOX_CSS, settle=1.0),
+            LISTING_TIMEOUT,
+            "listing_boxes",
+        )
 
-    # Görgetés a dinamikus tartalom betöltéséhez
+    # Görgetés a dinamikus tartalom betöltéséhez: amíg a várt darabszám meg
+    # nem lesz, illetve (ismeretlen darabszámnál) amíg a magasság nő
     last_height = driver.execute_script("return document.body.scrollHeight")
-    while True:
+    while not ready:
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
+        new_height = wait_until(
+            driver, readiness.scroll_height_changed(last_height), SCROLL_TIMEOUT, "scroll"
+        )
+        if new_height is None:
             break
         last_height = new_height
+        if expected:
+            ready = readiness.element_count_at_least(PRODUCT_BOX_CSS, expected)(driver)
+
+    entries = listing_entries(LISTING_SCHEMA.extract(driver.page_source), page_url)
+    print(f"Oldal: {page_url} - Talált termékek száma: {len(entries)}")
+    return entries
+
+# ----------------------------------------------------------------------------
+# 5) SCRAPE
+# ----------------------------------------------------------------------------
+# 5/a) Listaoldalak: termék URL-ek, nevek és árak összegyűjtése
+def fetch_listing_pages(ctx, category, pages):
+    """{oldalszám: html vagy None}: HTTP-n párhuzamosan; ami így nem jött le, a böngészőkkel."""
+    urls = {page: category.listing_page_url(page) for page in pages}
+    htmls = {}
+    if USE_HTTP_FETCH:
+        fetched = ctx.fetch(list(urls.values()))
+        htmls = {page: fetched.get(url) for page, url in urls.items()}
+    missing = [page for page in pages if not htmls.get(page)]
+    if missing:
+        htmls.update(zip(missing, ctx.pool.map(load_listing_html, [urls[page] for page in missing])))
+    return htmls
+
+def discover_listing(ctx, category):
+    """A kategória termékei [(product_url, product_name, price), ...] a listázási sorrendben."""
+    # Oldalszám felderítése: az első oldal lapozójából, majd a többi oldaléból,
+    # amíg új (nagyobb) oldalszám kerül elő; az oldalak párhuzamosan töltődnek
+    listing_fields = {}   # oldalszám -> kinyert listaoldal mezők (None, ha nem jött le)
+    last_page = category.total_pages or 1
+    total_products = None
+    page_size = None
+    while True:
+        todo = [page for page in range(1, last_page + 1) if page not in listing_fields]
+        if not todo:
+            break
+        for page, html in fetch_listing_pages(ctx, category, todo).items():
+            fields = LISTING_SCHEMA.extract(html) if html else None
+            listing_fields[page] = fields
+            if not fields:
+                continue
+            found_last, found_total, found_size = listing_pagination(fields)
+            if page == 1:
+                page_size = found_size
+            if category.total_pages is None:
+                last_page = max(last_page, found_last)
+                total_products = total_products or found_total
+    print(f"[{category.name}] Listaoldalak: {last_page}, "
+          f"termékek a lapozó szerint: {total_products or 'ismeretlen'}")
+
+    # Oldalméret: a találatszám "1 - 24" tartományából, különben az 1. oldal
+    # termékdobozainak számából (ha van következő oldal, az 1. oldal tele van)
+    first_fields = listing_fields.get(1)
+    if page_size is None and first_fields and last_page > 1:
+        page_size = len(first_fields["products"]) or None
+
+    def expected_on_page(page):
+        """A várt termékszám az oldalon; az utolsó oldalon a maradék (ha ismert a találatszám)."""
+        if page_size is None:
+            return None
+        if total_products is None:
+            return page_size if page < last_page else None
+        return max(0, min(page_size, total_products - (page - 1) * page_size))
+
+    # A HTTP-n teljesen lejött oldalak kész vannak; a hiányosak (pl. görgetésre
+    # betöltődő termékek) böngészővel, a várt darabszámig görgetve töltődnek be
+    page_entries = {}
+    browser_pages = []
+    for page in range(1, last_page + 1):
+        fields = listing_fields.get(page)
+        expected = expected_on_page(page)
+        if USE_HTTP_FETCH and fields and expected is not None and len(fields["products"]) >= expected:
+            page_entries[page] = listing_entries(fields, category.listing_page_url(page))
+        else:
+            browser_pages.append(page)
+    if browser_pages:
+        loaded = ctx.pool.map(
+            lambda driver, page: load_listing_page(driver, category.listing_page_url(page), expected_on_page(page)),
+            browser_pages,
+        )
+        page_entries.update(zip(browser_pages, loaded))
+
+    listing = []
+    seen_urls = set()
+    for page in range(1, last_page + 1):
+        for entry in page_entries.get(page) or []:
+            # Egy termék (URL) csak egyszer szerepel, akkor is, ha több oldalon is megjelenik
+            if entry[0] not in seen_urls:
+                seen_urls.add(entry[0])
+                listing.append(entry)
+    return listing
+
+def assign_owners(listings):
+    """
+    Kategóriák közötti deduplikálás URL szerint: minden termék a manifest
+    sorrendjében első kategóriájához tartozik. Visszatérés: a kategóriánként
+    megmaradó listák és a duplikátumok [(url, tulajdonos, további kategóriák)].
+    """
+    owner = {}
+    others = {}
+    owned = []
+    for category, listing in listings:
+        kept = []
+        for entry in listing:
+            url = entry[0]
+            if url in owner:
+                others.setdefault(url, []).append(category.name)
+            else:
+                owner[url] = category.name
+                kept.append(entry)
+        owned.append((category, kept))
+    duplicates = [(url, owner[url], names) for url, names in others.items()]
+    return owned, duplicates
+
+def write_duplicates(path, duplicates):
+    """A több kategóriában is listázott termékek (kézi kategória hozzárendeléshez)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("url\towner\tother_categories\n")
+        for url, owner, names in duplicates:
+            f.write(f"{url}\t{owner}\t{','.join(names)}\n")
+
+# 5/b) Termékoldalak: letöltés és parse átfedésben (ParsePipeline)
+def product_rows_pipeline(ctx, products, settings):
+    """
+    products: {url: (slug, képnév, név, ár)}, settings: row_settings().
+    Generátor: (url, (main_row, product_property_rows, image_url)) párok, ahogy
+    a parse workerek végeznek. Először HTTP-n (csak a teljes oldalak számítanak),
+    a hiányos / le nem töltött oldalak ezután a böngészőkkel; a letöltők
+    mindkét esetben a korlátos parse sorba tesznek, és megállnak, ha az megtelt.
+    A scrape_worker.py is ezt használja (ott ctx egy FetchContext).
+    """
+    urls = list(products)
+
+    def job(url, html, require_complete):
+        return html, require_complete, settings, products[url]
+
+    missing = set(urls)
+    if USE_HTTP_FETCH and urls:
+        def produce_http(put):
+            def on_page(url, html):
+                if html:
+                    put(url, job(url, html, True))
+            ctx.fetch(urls, on_page=on_page)
+
+        for url, rows in ctx.parser.run(produce_http):
+            if rows is not None:
+                missing.discard(url)
+                yield url, rows
+        print(f"HTTP-n kész termékoldalak: {len(urls) - len(missing)}/{len(urls)}")
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    product_boxes = soup.find_all("div", class_="product-snapshot list_div_item")
-    print(f"Oldal: {page_url} - Talált termékek száma: {len(product_boxes)}")
-    
-    for box in product_boxes:
-        title_anchor = box.find("a", class_="img-thumbnail-link")
-        if not title_anchor:
+    fallback_urls = [url for url in urls if url in missing]
+    if fallback_urls:
+        print(f"Böngészővel betöltendő termékoldalak: {len(fallback_urls)}")
+
+        def produce_browser(put):
+            def load(driver, url):
+                put(url, job(url, load_product_html(driver, url), False))
+            ctx.pool.map(load, fallback_urls)
+
+        for url, rows in ctx.parser.run(produce_browser):
+            if rows is not None:
+                yield url, rows
+
+def distributed_product_rows(work_queue, batch, products, settings):
+    """
+    Mint a product_rows_pipeline, de a munkát a scrape_worker.py workerek
+    végzik: a termékek a munkasorba kerülnek (a koordinátor által kiosztott
+    SLUG-gal), az eredmények a collect()-tel jönnek vissza.
+    """
+    work_queue.enqueue(batch, [
+        (url, {"product": list(product), "settings": settings}) for url, product in products.items()
+    ])
+    print(f"Munkasorba téve: {len(products)} termékoldal ({batch}), várakozás a workerekre")
+    last_result = last_status = time.monotonic()
+    while True:
+        results = work_queue.collect(batch)
+        for url, (main_row, product_property_rows, image_url) in results:
+            yield url, (main_row, product_property_rows, image_url)
+        counts = work_queue.counts(batch)
+        if not results and not counts.get("pending") and not counts.get("leased") and not counts.get("done"):
+            break
+        now = time.monotonic()
+        if results:
+            last_result = now
             continue
-        product_url = title_anchor.get("href", "")
-        if product_url and not product_url.startswith("http"):
-            product_url = "https://bikepro.hu" + product_url
-        
-        product_name = title_anchor.get("title", "").strip() or title_anchor.get_text(strip=True)
-        
-        price_tag = box.find("span", class_="product-price")
-        price = price_tag.get_text(strip=True) if price_tag else ""
-
-        # Generáljunk egy SLUG-ot a product_counter alapján (pl. alk0001, alk0002, stb.)
-        slug_str = f"kit{product_counter:04d}"
-        
-        # Termék részletes oldal betöltése
-        driver.get(product_url)
-        time.sleep(2)
-        soup_product = BeautifulSoup(driver.page_source, "html.parser")
-        
-        # Tulajdonságok kinyerése
-        try:
-            param_tab = WebDriverWait(driver, 3).until(
-                EC.element_to_be_clickable((By.ID, "productparams-tab"))
-            )
-            param_tab.click()
-            time.sleep(1)
-        except Exception:
-            pass
-
-        param_soup = BeautifulSoup(driver.page_source, "html.parser")
-        param_table = param_soup.find("table", class_="parameter-table")
-        found_props = {}
-        if param_table:
-            for row in param_table.find_all("tr"):
-                cols = row.find_all("td")
-                if len(cols) == 2:
-                    key = cols[0].get_text(strip=True)
-                    val = cols[1].get_text(strip=True).replace("\xa0", " ")
-                    # Példa: "Színválaszték" -> "szin"
-                    if key.lower() == "színválaszték":
-                        key = "Szín"
-                    found_props[key] = val
-
-        # Gyártó
-        manufacturer = found_props.get("Gyártó")
-        if not manufacturer:
-            manufacturer = random.choice(["Acor", "Laken", "SKS", "Bikefun"])
-        found_props["Gyártó"] = manufacturer
-
-        # Fix property
-        if "Alapanyag" not in found_props:
-            found_props["Vázméret"] = "Műanyag"
-        if "Űrtartalom" not in found_props:
-            found_props["Űrtartalom"] = "0,75 Liter"
-
-        # Leírás kinyerése
-        try:
-            desc_tab = WebDriverWait(driver, 3).until(
-                EC.element_to_be_clickable((By.ID, "productdescriptionnoparameters-tab"))
+        if WORK_QUEUE_TIMEOUT and now - last_result > WORK_QUEUE_TIMEOUT:
+            print(f"[{batch}] {WORK_QUEUE_TIMEOUT} mp óta nincs eredmény, a köteg maradéka kimarad: "
+                  f"{counts.get('pending', 0)} várakozó, {counts.get('leased', 0)} lefoglalt")
+            break
+        if now - last_status >= WORK_QUEUE_STATUS_EVERY:
+            last_status = now
+            print(f"[{batch}] Várakozás a workerekre: {counts.get('pending', 0)} várakozó, "
+                  f"{counts.get('leased', 0)} lefoglalt, {counts.get('collected', 0)} kész")
+        time.sleep(WORK_QUEUE_POLL)
+    for url, error in work_queue.failed(batch):
+        print(f"Worker hiba: {url}: {error}")
+
+# 5/c) Egy kategória termékeinek feldolgozása
+def scrape_category(ctx, category, listing):
+    """
+    A kategória termékeinek betöltése és kiírása. A checkpoint store-t adja
+    vissza: a háttérben futó képletöltések még írják, a hívó zárja le.
+    """
+    # Checkpoint: sorszámok (SLUG) URL szerint, a kész termékek kimaradnak
+    store = CheckpointStore(category.checkpoint_path)
+    counters = store.assign_counters([url for url, _, _ in listing])
+    finished_urls = store.finished_urls()
+    pending = [entry for entry in listing if entry[0] not in finished_urls]
+    print(f"[{category.name}] Checkpoint: {len(listing) - len(pending)} kész termék, {len(pending)} hátravan")
+
+    # Új termékek: a sorok a parse workerekből jönnek, a befejezés sorrendjében;
+    # a checkpointba mentés és a képletöltés rögtön indul
+    products = {
+        url: (category.slug(counters[url]), os.path.basename(category.image_filename(counters[url])), name, price)
+        for url, name, price in pending
+    }
+    settings = row_settings(
+        ctx.catalog.alias_map(category.property_category),
+        category.default_manufacturers,
+        category.fixed_properties,
+    )
+    if ctx.work_queue is not None:
+        product_rows = distributed_product_rows(ctx.work_queue, category.name, products, settings)
+    else:
+        product_rows = product_rows_pipeline(ctx, products, settings)
+
+    # Termékek kiírása a listázási sorrendben (a SLUG-ok a checkpoint sorszámaiból jönnek),
+    # amint a soron következő termék elkészült; csak a sorrenden kívül érkezők várnak.
+    # A sorok termékenként azonnal kiíródnak: a Main munkafüzetbe (write-only mód)
+    # és a pipeline.sqlite-ba; hiba esetén a finally ág a részleges munkafüzetet is elmenti.
+    main_sheet = StreamingSheetWriter(category.main_export_path, MAIN_HEADERS, sheet_name="Main")
+    property_sheet = (
+        StreamingSheetWriter(category.property_export_path, PROPERTY_HEADERS) if WRITE_PROPERTY_XLSX else None
+    )
+    artifacts = ArtifactStore(artifact_path(category.folder))
+    built = {}       # a már kész, de a sorrendben még nem következő termékek sorai
+    spilled = set()  # ugyanezek a REORDER_BUFFER felett: csak a checkpointban
+    next_index = [0]
+
+    def emit_product(slug, main_row, product_property_rows):
+        """Egy kész termék sorainak kiírása (Main xlsx, pipeline.sqlite, opcionálisan property xlsx)."""
+        main_sheet.append(main_row)
+        artifacts.write_product(slug, main_row, product_property_rows)
+        if property_sheet is not None:
+            property_sheet.extend(product_property_rows)
+
+    def emit_ready(final=False):
+        """A listázási sorrendben következő kész termékek kiírása; final: a pipeline véget ért."""
+        while next_index[0] < len(listing):
+            product_url = listing[next_index[0]][0]
+            product_counter = counters[product_url]
+            slug_str = category.slug(product_counter)
+            image_filename = category.image_filename(product_counter)
+
+            if product_url in built:
+                emit_product(slug_str, *built.pop(product_url))
+            elif product_url in spilled:
+                # A kép letöltése már elindult, csak a sorok jönnek a checkpointból
+                spilled.discard(product_url)
+                main_row, product_property_rows, _, _ = store.load_product(product_url)
+                emit_product(slug_str, main_row, product_property_rows)
+            elif product_url not in products:
+                # Korábbi futásban már kész: sorok a checkpointból, kép csak ha hiányzik
+                saved = store.load_product(product_url)
+                if saved:
+                    main_row, product_property_rows, image_url, image_status = saved
+                    # Összevont módban az images_saver.py elmozgatja a staging képeket, ott elég az állapot
+                    image_done = image_status == "none" or (
+                        image_status == "ok" and (FUSED_IMAGE_PIPELINE or os.path.exists(image_filename))
+                    )
+                    if not image_done:
+                        save_product_image(ctx, store, product_url, image_url, image_filename)
+                    emit_product(slug_str, main_row, product_property_rows)
+                else:
+                    print(f"Termékoldal nem tölthető be, kihagyva: {product_url}")
+            elif final:
+                print(f"Termékoldal nem tölthető be, kihagyva: {product_url}")
+            else:
+                break
+            next_index[0] += 1
+
+    try:
+        emit_ready()
+        for product_url, (main_row, product_property_rows, image_url) in product_rows:
+            # A property nevek felvétele a katalógusba (a generate_*.py innen dolgozik)
+            for property_row in product_property_rows:
+                ctx.catalog.intern(category.property_category, property_row["Property Name"])
+
+            # Mentés a checkpointba, majd a kép letöltése
+            store.save_product(product_url, main_row, product_property_rows, image_url)
+            save_product_image(
+                ctx, store, product_url, image_url, category.image_filename(counters[product_url])
             )
-            desc_tab.click()
-            time.sleep(1)
-        except Exception:
-            pass
-
-        desc_soup = BeautifulSoup(driver.page_source, "html.parser")
-        full_description = ""
-        desc_container = desc_soup.find("div", id="productdescriptionnoparameters-wrapper")
-        if desc_container:
-            desc_span = desc_container.find("span", class_="product-desc")
-            if desc_span:
-                full_description = desc_span.get_text(strip=True)
-        if not full_description:
-            short_desc = desc_soup.find("td", class_="product-short-description")
-            if short_desc:
-                full_description = short_desc.get_text(strip=True)
-        
-        # Csak az első kép kinyerése
-        image_url = ""
-        product_image_main = soup_product.find("div", class_="product-image-main")
-        if product_image_main:
-            image_link = product_image_main.find("a", id="product-image-link")
-            if image_link and image_link.has_attr("href"):
-                image_url = image_link["href"]
-        if not image_url:
-            image_url_tag = soup_product.find("img", {"itemprop": "image"})
-            if image_url_tag and image_url_tag.has_attr("src"):
-                image_url = image_url_tag["src"]
-        
-        image_filename = os.path.join(image_folder, f"product_image_alkouv_{product_counter}.jpg")
-        download_and_convert_image(image_url, image_filename)
-        
-        # ----------------------------------------------------------------------------
-        # MAIN SHEET FELÉPÍTÉSE
-        # ----------------------------------------------------------------------------
-        # A sample “main” oszlopok kitöltése (SLUG, Name, Price, Manufacturer, stb.)
-        # A hiányzókat default értékre állítjuk (pl. 0 Ft, NO, YES, stb.)
-
-        main_row = {
-            "SLUG": slug_str,
-            "Active": "YES",
-            "Featured": "NO",
-            "SKU": slug_str.upper(),
-            "Name": product_name,
-            "Product Type": "", 
-            "MSRP": "0,00 Ft",
-            "Cost": "0,00 Ft",
-            "Price": price if price else "0 Ft",
-            "Manufacturer": manufacturer,
-            "Vendor": "",
-            "Image": os.path.basename(image_filename),  # pl. "product_image_ruha_1.jpg"
-            "Description": full_description,
-            "Search Keywords": "",
-            "Meta Title": "",
-            "Meta Description": "",
-            "Meta Keywords": "",
-            "Tax Schedule": "",
-            "Tax Exempt": "NO",
-            "Weight": "0,0000000000",
-            "Length": "0,0000000000",
-            "Width": "0,0000000000",
-            "Height": "0,0000000000",
-            "Extra Ship Fee": "0,00 Ft",
-            "Ship Mode": "ShipFromSite",
-            "Non-Shipping Product": "NO",
-            "Ships in a Separate Box": "NO",
-            "Allow Reviews": "YES",
-            "Minimum Qty": "0",
-            "Inventory Mode": "AlwayInStock",
-            "Inventory": "0",
-            "Stock Out at": "0",
-            "Low Stock at": "0",
-            "Roles": "",
-            "Searchable": "YES",
-            "AllowUpcharge": "NO",
-            "UpchargeAmount": "0,0000000000",
-            "UpchargeUnit": "1",
-        }
-        main_data.append(main_row)
-
-        # ----------------------------------------------------------------------------
-        # PROPERTY SHEET FELÉPÍTÉSE
-        # ----------------------------------------------------------------------------
-        # A property Excel-ben a “PRODUCT SLUG” oszlopban csak az első tulajdonságsornál
-        # tüntetjük fel az adott SLUG-ot, utána üres marad (lásd a felhasználó kérése).
-        found_prop_items = list(found_props.items())  # (key, val) párok
-        for i, (prop_name, prop_value) in enumerate(found_prop_items):
-            if prop_name != "Gyártó":
-                property_row = {
-                "PRODUCT SLUG": slug_str if i == 0 else "",
-                "Property Name": prop_name,
-                "Value": prop_value,
-            }
-            property_data.append(property_row)
-        product_counter += 1
-
-driver.quit()
+            if len(built) < REORDER_BUFFER:
+                built[product_url] = (main_row, product_property_rows)
+            else:
+                spilled.add(product_url)
+            emit_ready()
+        emit_ready(final=True)
+    finally:
+        main_sheet.close()
+        if property_sheet is not None:
+            property_sheet.close()
+        artifacts.close()
+    return store
 
 # ----------------------------------------------------------------------------
-# 7) ADATOK ÁTALAKÍTÁSA ÉS MENTÉSE KÉT KÜLÖN EXCELBE
+# 6) FUTTATÁS ÉS ÖSSZESÍTÉS
 # ----------------------------------------------------------------------------
-df_main = pd.DataFrame(main_data)
-df_prop = pd.DataFrame(property_data)
+def main():
+    os.makedirs(project_folder, exist_ok=True)
+    categories = load_categories()
+    ctx = CrawlContext()
+    stores = []
+    try:
+        # Először minden kategória listaoldalai, hogy a közös termékek gazdája
+        # a termékoldalak letöltése előtt eldőljön
+        listings = [(category, discover_listing(ctx, category)) for category in categories]
+        owned, duplicates = assign_owners(listings)
+        if duplicates:
+            duplicates_path = os.path.join(project_folder, "category_duplicates.tsv")
+            write_duplicates(duplicates_path, duplicates)
+            print(f"Több kategóriában is listázott termékek: {len(duplicates)} "
+                  f"(egyszer töltődnek le, lásd {duplicates_path})")
 
-# 1) Igazítjuk az oszlopokat a kívánt sorrendhez
-df_main = df_main.reindex(columns=MAIN_HEADERS)
-df_prop = df_prop.reindex(columns=PROPERTY_HEADERS)
+        for category, listing in owned:
+            stores.append(scrape_category(ctx, category, listing))
+    finally:
+        # A képletöltések a checkpointokba írnak: előbb ezek fejeződnek be
+        ctx.close()
+        for store in stores:
+            store.close()
 
-# 2) Tisztítjuk a cellákat
-for df in [df_main, df_prop]:
-    for col in df.columns:
-        df[col] = df[col].apply(remove_illegal_chars)
+    readiness.STATS.print_summary()
+    ctx.http_cache.report()
+    ctx.scheduler.report()
+    ctx.parser.report()
+    # Batch módban a várakozási statisztika a teljes futásra vonatkozik
+    waits_folder = categories[0].folder if len(categories) == 1 else project_folder
+    readiness.STATS.save_csv(os.path.join(waits_folder, "waits.csv"))
 
-# 3) Exportáljuk két külön Excel fájlba
-main_export_path = os.path.join(mentes_folder, "bikepro_hotcakes_import_tisztitott_main.xlsx")
-property_export_path = os.path.join(mentes_folder, "bringaland_hotcakes_import_tisztitott_property.xlsx")
+    print("Export complete:")
+    for category in categories:
+        print(f"[{category.name}] Main Excel: {category.main_export_path}")
+        print(f"[{category.name}] Artifacts: {artifact_path(category.folder)}")
+        if WRITE_PROPERTY_XLSX:
+            print(f"[{category.name}] Property Excel: {category.property_export_path}")
 
-df_main.to_excel(main_export_path, sheet_name='Main', index=False)
-df_prop.to_excel(property_export_path, index=False)
 
-print("Export complete:")
-print(f"Main Excel: {main_export_path}")
-print(f"Property Excel: {property_export_path}")
+if __name__ == "__main__":
+    main()
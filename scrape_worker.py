@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import socket
+from scrape import FetchContext, product_rows_pipeline, WORK_QUEUE_AUTHKEY, work_queue_path
+from work_queue import LEASE_SECONDS, LeaseKeeper, open_queue
+
+# ----------------------------------------------------------------------------
+# Elosztott crawl worker (a koordinátor a scrape.py, DISTRIBUTED = True mellett).
+# Feladatokat foglal le a munkasorból, letölti és feldolgozza a termékoldalakat
+# (HTTP, tartalékként a saját böngészőivel, parse a saját processzeiben), és a
+# kész sorokat + kép URL-t visszaírja. A SLUG-ot a feladat tartalmazza, a
+# worker nem oszt ki sorszámot.
+#
+#   python scrape_worker.py                          ugyanezen a gépen (sqlite)
+#   python scrape_worker.py tcp://koordinator:50000  másik gépről
+#                                                    (SCRAPE_QUEUE_KEY környezeti változó)
+# A böngészők száma, a timeoutok stb. a scrape.py beállításai.
+# ----------------------------------------------------------------------------
+
+QUEUE_URL = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{work_queue_path}"
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+
+# Egyszerre lefoglalt feladatok (egy adag letöltése és parse-a párhuzamosan fut)
+CLAIM_SIZE = 32
+# Helyi HTTP cache (a worker gépén)
+WORKER_CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "http_cache_worker")
+POLL_SECONDS = 2.0
+# Ennyi mp üresjárat után a worker kilép (0 = soha)
+IDLE_EXIT_SECONDS = 300
+
+
+def process_tasks(ctx, work_queue, tasks):
+    """Egy lefoglalt adag feldolgozása, kötegenként (a beállítások kötegenként azonosak)."""
+    by_batch = {}
+    for batch, url, payload in tasks:
+        by_batch.setdefault(batch, []).append((url, payload))
+    for batch, items in by_batch.items():
+        products = {url: tuple(payload["product"]) for url, payload in items}
+        settings = items[0][1]["settings"]
+        done = set()
+        for url, rows in product_rows_pipeline(ctx, products, settings):
+            work_queue.complete(WORKER_ID, batch, url, list(rows))
+            done.add(url)
+        for url in products:
+            if url not in done:
+                work_queue.fail(WORKER_ID, batch, url, f"termékoldal nem tölthető be ({WORKER_ID})")
+        print(f"[{batch}] {len(done)}/{len(products)} termékoldal kész")
+
+
+def main():
+    work_queue = open_queue(QUEUE_URL, WORK_QUEUE_AUTHKEY)
+    ctx = FetchContext(WORKER_CACHE_FOLDER)
+    keeper = LeaseKeeper(work_queue, WORKER_ID, LEASE_SECONDS)
+    print(f"Worker {WORKER_ID}: {QUEUE_URL}")
+    try:
+        idle_since = time.monotonic()
+        while True:
+            tasks = work_queue.claim(WORKER_ID, CLAIM_SIZE, LEASE_SECONDS)
+            if not tasks:
+                if IDLE_EXIT_SECONDS and time.monotonic() - idle_since > IDLE_EXIT_SECONDS:
+                    print("Nincs több feladat, kilépés")
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+            process_tasks(ctx, work_queue, tasks)
+            idle_since = time.monotonic()
+    finally:
+        keeper.stop()
+        ctx.close()
+        work_queue.close()
+        ctx.scheduler.report()
+        ctx.parser.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import math
+import sys
+
+# ------------------------------------------------------------------------------
+# Shared SQL Server INSERT emitter for the generate_*.py scripts.
+# Rows are grouped into multi-row INSERT ... VALUES statements (SQL Server
+# allows at most 1000 rows per VALUES list) and several statements are
+# wrapped in one explicit transaction, so SSMS does one round-trip and one
+# log flush per batch instead of per row. All values go through sql_literal.
+# ------------------------------------------------------------------------------
+
+# SQL Server limit for a table value constructor
+MAX_ROWS_PER_INSERT = 1000
+
+
+class SqlRaw(str):
+    """A value written into the SQL as-is (e.g. SqlRaw("GETDATE()"))."""
+
+
+NULL = SqlRaw("NULL")
+
+
+def sql_literal(value):
+    """Python value -> SQL Server literal. Strings become N'...' with quotes doubled."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, SqlRaw):
+        return str(value)
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NULL"
+        return str(int(value)) if value.is_integer() else repr(value)
+    if hasattr(value, "item"):
+        # numpy scalars (pandas cells)
+        return sql_literal(value.item())
+    return "N'" + str(value).replace("'", "''") + "'"
+
+
+def sql_string_series(series):
+    """sql_literal for a whole pandas Series of strings (vectorized, no NULL handling)."""
+    return "N'" + series.str.replace("'", "''", regex=False) + "'"
+
+
+def sql_values(values):
+    """One VALUES row: (v1, v2, ...)."""
+    return "(" + ", ".join(sql_literal(v) for v in values) + ")"
+
+
+class SqlBatchWriter:
+    """
+    Writes INSERT statements for one table to a text stream.
+
+    rows_per_insert:         rows per INSERT ... VALUES statement (<= 1000)
+    inserts_per_transaction: INSERT statements per BEGIN/COMMIT block
+    preamble / postamble:    statements written before the first and after
+                             the last transaction (e.g. SET IDENTITY_INSERT)
+    close_output:            close() also closes the stream
+    """
+
+    def __init__(self, out, table, columns, rows_per_insert=MAX_ROWS_PER_INSERT,
+                 inserts_per_transaction=10, preamble=(), postamble=(), close_output=False):
+        if not 0 < rows_per_insert <= MAX_ROWS_PER_INSERT:
+            raise ValueError(f"rows_per_insert must be between 1 and {MAX_ROWS_PER_INSERT}")
+        self.out = out
+        self.table = table
+        self.columns = list(columns)
+        self.rows_per_insert = rows_per_insert
+        self.inserts_per_transaction = inserts_per_transaction
+        self.postamble = list(postamble)
+        self.close_output = close_output
+        self.rows = 0
+        self._pending = []
+        self._inserts_in_transaction = 0
+        self._in_transaction = False
+
+        self.out.write("SET XACT_ABORT ON;\nSET NOCOUNT ON;\n")
+        for statement in preamble:
+            self.out.write(statement.rstrip(";") + ";\n")
+        self.out.write("\n")
+
+    def _flush_insert(self):
+        if not self._pending:
+            return
+        if not self._in_transaction:
+            self.out.write("BEGIN TRANSACTION;\n")
+            self._in_transaction = True
+        column_list = ", ".join(f"[{c}]" for c in self.columns)
+        self.out.write(f"INSERT INTO {self.table} ({column_list})\nVALUES\n")
+        self.out.write(",\n".join(self._pending))
+        self.out.write(";\n")
+        self._pending = []
+        self._inserts_in_transaction += 1
+        if self._inserts_in_transaction >= self.inserts_per_transaction:
+            self._commit()
+
+    def _commit(self):
+        if self._in_transaction:
+            self.out.write("COMMIT TRANSACTION;\nGO\n\n")
+            self._in_transaction = False
+            self._inserts_in_transaction = 0
+
+    def write_row(self, values):
+        """One row, values in the order of `columns`."""
+        if len(values) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} values, got {len(values)}")
+        self.write_rendered(sql_values(values))
+
+    def write_rows(self, rows):
+        for values in rows:
+            self.write_row(values)
+
+    def write_rendered(self, rendered_row):
+        """An already rendered VALUES row, e.g. "(N'abc', 1)"."""
+        self._pending.append(rendered_row)
+        self.rows += 1
+        if len(self._pending) >= self.rows_per_insert:
+            self._flush_insert()
+
+    def close(self):
+        self._flush_insert()
+        self._commit()
+        for statement in self.postamble:
+            self.out.write(statement.rstrip(";") + ";\n")
+        if self.close_output:
+            self.out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+def stdout_writer(table, columns, **kwargs):
+    """SqlBatchWriter printing to the console (for the scripts that print their SQL)."""
+    return SqlBatchWriter(sys.stdout, table, columns, **kwargs)
+
+
+def file_writer(path, table, columns, **kwargs):
+    """SqlBatchWriter writing a new UTF-8 .sql file (closed by close())."""
+    return SqlBatchWriter(open(path, "w", encoding="utf-8"), table, columns, close_output=True, **kwargs)
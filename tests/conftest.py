@@ -0,0 +1,20 @@
+import os
+import sys
+import pytest
+
+# A modulok a repo gyökerében vannak (nincs csomag)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fixture_server import serve_fixtures  # noqa: E402
+
+FIXTURE_FOLDER = os.path.join(ROOT, "tests", "fixtures")
+
+
+@pytest.fixture(scope="session")
+def fixture_site():
+    """A tests/fixtures oldalai helyi szerveren; a server.origin a base URL helye."""
+    server = serve_fixtures(FIXTURE_FOLDER)
+    yield server
+    server.shutdown()
+    server.server_close()
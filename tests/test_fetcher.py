@@ -0,0 +1,113 @@
+from crawl_scheduler import CrawlScheduler
+from extraction import LISTING_SCHEMA, listing_pagination
+from fetcher import fetch_all
+from product_rows import parse_product, row_settings
+from scrape import listing_entries
+
+# ----------------------------------------------------------------------------
+# A fetcher és a kinyerés a helyi fixture szerver ellen (tests/fixtures):
+# két listaoldal 5 termékkel, ebből 3 termékoldal jó, egy nem dekódolható
+# (latin-2 bájtok utf-8 fejléccel), egy nincs elmentve (404).
+# ----------------------------------------------------------------------------
+
+CATEGORY_PATH = "/kerekpar_kiegeszitok/kulacs_kulacstarto_329/kulacs_486"
+SETTINGS = row_settings({"színválaszték": "Szín"}, ["Acor"], [["Alapanyag", "Vázméret", "Műanyag"]])
+
+
+def fetch(urls, **kwargs):
+    # Gyors újrapróbálás, hogy a hibás oldalak ne lassítsák a teszteket
+    scheduler = CrawlScheduler(max_retries=1, backoff_base=0.01)
+    return fetch_all(urls, concurrency=4, timeout=5, scheduler=scheduler, **kwargs)
+
+
+def listing_urls(origin):
+    base_url = origin + CATEGORY_PATH
+    return [base_url, base_url + "?page=2"]
+
+
+def discover(origin):
+    """[(url, név, ár), ...] a két listaoldalról, listázási sorrendben."""
+    urls = listing_urls(origin)
+    htmls = fetch(urls)
+    return [entry for url in urls for entry in listing_entries(LISTING_SCHEMA.extract(htmls[url]), url)]
+
+
+def test_listing_pages(fixture_site):
+    first, second = listing_urls(fixture_site.origin)
+    htmls = fetch([first, second])
+    first_fields = LISTING_SCHEMA.extract(htmls[first])
+    second_fields = LISTING_SCHEMA.extract(htmls[second])
+    assert len(first_fields["products"]) == 3
+    assert len(second_fields["products"]) == 2
+    # Utolsó oldal, összes termék, oldalméret
+    assert listing_pagination(first_fields) == (2, 5, 3)
+
+
+def test_listing_links_resolve_to_the_served_site(fixture_site):
+    entries = discover(fixture_site.origin)
+    assert [name for _, name, _ in entries] == [
+        "Elite Fly kulacs 550 ml",
+        "SKS kulacs 750 ml",
+        "Acor kulacs 600 ml",
+        "Laken alu kulacs 600 ml",
+        "Zefal kulacs 800 ml",
+    ]
+    # Abszolút (átírt), gyökérrelatív és relatív linkek is a helyi szerverre mutatnak
+    base_url = fixture_site.origin + CATEGORY_PATH
+    assert all(url.startswith(base_url + "/") for url, _, _ in entries)
+
+
+def test_product_pages(fixture_site):
+    entries = discover(fixture_site.origin)
+    htmls = fetch([url for url, _, _ in entries])
+    rows = {}
+    for counter, (url, name, price) in enumerate(entries, 1):
+        if htmls[url] is None:
+            continue
+        job = (htmls[url], True, SETTINGS, (f"kit{counter:04d}", f"img{counter}.jpg", name, price))
+        rows[name] = parse_product(job)
+
+    # A nem dekódolható és a hiányzó oldal kimarad, a többi sorai elkészülnek
+    assert sorted(rows) == ["Acor kulacs 600 ml", "Elite Fly kulacs 550 ml", "SKS kulacs 750 ml"]
+
+    main_row, property_rows, image_url = rows["Elite Fly kulacs 550 ml"]
+    assert main_row["Manufacturer"] == "Elite"
+    assert image_url == fixture_site.origin + "/img/elite_fly.jpg"
+    # A Gyártó az első paraméter, mégis minden property pontosan egyszer szerepel
+    assert [(row["Property Name"], row["Value"]) for row in property_rows] == [
+        ("Űrtartalom", "0,55 Liter"),
+        ("Szín", "átlátszó"),
+        ("Alapanyag", "Műanyag"),
+    ]
+    assert [row["PRODUCT SLUG"] for row in property_rows] == ["kit0001", "", ""]
+
+    # Paramétertábla és leírás nélkül: a beágyazott schema.org adatból
+    _, property_rows, _ = rows["Acor kulacs 600 ml"]
+    assert len(property_rows) == 3   # Szín, Űrtartalom + a fix Vázméret
+    assert property_rows[0]["PRODUCT SLUG"] == "kit0003"
+
+
+def test_missing_page_returns_none(fixture_site):
+    url = fixture_site.origin + CATEGORY_PATH + "/zefal_kulacs_p1005"
+    assert fetch([url]) == {url: None}
+
+
+def test_undecodable_page_returns_none(fixture_site, capsys):
+    good = fixture_site.origin + CATEGORY_PATH + "/sks_kulacs_750_ml_p1002"
+    bad = fixture_site.origin + CATEGORY_PATH + "/laken_alu_kulacs_p1004"
+    htmls = fetch([bad, good])
+    # A hibás kódolás csak az adott oldalt érinti, a többi letöltés folytatódik
+    assert htmls[bad] is None
+    assert "SKS kulacs 750 ml" in htmls[good]
+    assert "Nem dekódolható oldal" in capsys.readouterr().out
+
+
+def test_on_page_receives_every_page(fixture_site):
+    urls = [fixture_site.origin + CATEGORY_PATH + path for path in (
+        "/elite_fly_kulacs_550_ml_p1001", "/laken_alu_kulacs_p1004", "/zefal_kulacs_p1005",
+    )]
+    delivered = {}
+    assert fetch(urls, on_page=lambda url, html: delivered.setdefault(url, html)) == {}
+    assert set(delivered) == set(urls)
+    assert delivered[urls[0]] is not None
+    assert delivered[urls[1]] is None and delivered[urls[2]] is None
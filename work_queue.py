@@ -0,0 +1,274 @@
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from multiprocessing.managers import BaseManager, MakeProxyType
+
+# ----------------------------------------------------------------------------
+# Munkasor az elosztott crawlhoz (scrape.py koordinátor + scrape_worker.py).
+# A koordinátor kötegenként (kategóriánként) felteszi a termék URL-eket, a
+# workerek bérlettel (lease) foglalnak le egy-egy adagot, és az eredményt
+# (sorok + kép URL) visszaírják; a koordinátor ezeket a collect()-tel veszi át.
+# Lejárt bérlet (pl. leállt worker) után a feladat újra kiosztható; a
+# max_attempts-edik sikertelen próbálkozás után "failed" lesz.
+#
+# A backend cserélhető, a WorkQueue metódusait kell megvalósítania:
+#   sqlite:///<fájl>      SqliteWorkQueue (egy gépen futó processzek)
+#   tcp://<host>:<port>   a koordinátor által serve_queue()-val kiszolgált sor
+#                         (multiprocessing manager, más gépekről is)
+# ----------------------------------------------------------------------------
+
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    batch       TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    status      TEXT NOT NULL,   -- pending / leased / done / collected / failed
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    result      TEXT,
+    error       TEXT,
+    updated     REAL,
+    PRIMARY KEY (batch, key)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until);
+"""
+
+
+class WorkQueue(ABC):
+    """A backendek közös felülete (a payload és az eredmény JSON-ba írható adat)."""
+
+    @abstractmethod
+    def enqueue(self, batch, items):
+        """items: [(key, payload)]; a köteg korábbi feladatai (és eredményei) törlődnek."""
+
+    @abstractmethod
+    def claim(self, worker, limit=10, lease=LEASE_SECONDS):
+        """Legfeljebb limit feladat lefoglalása: [(batch, key, payload)]."""
+
+    @abstractmethod
+    def extend(self, worker, lease=LEASE_SECONDS):
+        """A worker összes bérletének meghosszabbítása (életjel)."""
+
+    @abstractmethod
+    def complete(self, worker, batch, key, result):
+        """A feladat kész, az eredmény átvehető (collect)."""
+
+    @abstractmethod
+    def fail(self, worker, batch, key, error):
+        """Sikertelen próbálkozás: újra kiosztható, vagy max_attempts után "failed"."""
+
+    @abstractmethod
+    def collect(self, batch, limit=500):
+        """A kész, még át nem vett eredmények: [(key, result)]."""
+
+    @abstractmethod
+    def counts(self, batch):
+        """{állapot: darab} a köteg feladataira."""
+
+    @abstractmethod
+    def failed(self, batch):
+        """[(key, hibaüzenet)] a véglegesen sikertelen feladatokra."""
+
+    def close(self):
+        pass
+
+
+class SqliteWorkQueue(WorkQueue):
+    def __init__(self, path, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Több processz is használhatja: a foglalás BEGIN IMMEDIATE tranzakcióban fut
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _write(self):
+        """Írási tranzakció (BEGIN IMMEDIATE: a többi processz addig vár)."""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, batch, items):
+        now = time.time()
+        rows = [(batch, key, json.dumps(payload, ensure_ascii=False), now) for key, payload in items]
+        with self._write() as conn:
+            conn.execute("DELETE FROM tasks WHERE batch = ?", (batch,))
+            conn.executemany(
+                "INSERT INTO tasks (batch, key, payload, status, updated) VALUES (?, ?, ?, 'pending', ?)",
+                rows,
+            )
+        return len(rows)
+
+    def _recycle_expired(self, conn, now):
+        """Lejárt bérletek: újra kiosztható, vagy (túl sok próbálkozás után) sikertelen."""
+        conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = CASE WHEN attempts >= ? THEN 'lejárt bérlet' ELSE error END, "
+            "worker = NULL, lease_until = NULL, updated = ? "
+            "WHERE status = 'leased' AND lease_until < ?",
+            (self.max_attempts, self.max_attempts, now, now),
+        )
+
+    def claim(self, worker, limit=10, lease=LEASE_SECONDS):
+        now = time.time()
+        with self._write() as conn:
+            self._recycle_expired(conn, now)
+            rows = conn.execute(
+                "SELECT batch, key, payload FROM tasks WHERE status = 'pending' "
+                "ORDER BY updated, rowid LIMIT ?",
+                (limit,),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1, updated = ? WHERE batch = ? AND key = ?",
+                [(worker, now + lease, now, batch, key) for batch, key, _ in rows],
+            )
+        return [(batch, key, json.loads(payload)) for batch, key, payload in rows]
+
+    def extend(self, worker, lease=LEASE_SECONDS):
+        now = time.time()
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE worker = ? AND status = 'leased'",
+                (now + lease, worker),
+            )
+
+    def complete(self, worker, batch, key, result):
+        # Egy lejárt bérlet késve érkező eredménye is érvényes, amíg más nem végzett vele
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, error = NULL, worker = ?, updated = ? "
+                "WHERE batch = ? AND key = ? AND status IN ('pending', 'leased')",
+                (json.dumps(result, ensure_ascii=False), worker, time.time(), batch, key),
+            )
+
+    def fail(self, worker, batch, key, error):
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, worker = NULL, lease_until = NULL, updated = ? "
+                "WHERE batch = ? AND key = ? AND status = 'leased' AND worker = ?",
+                (self.max_attempts, str(error), time.time(), batch, key, worker),
+            )
+
+    def collect(self, batch, limit=500):
+        # A lejárt bérletek itt is felszabadulnak: akkor sem ragad be a köteg, ha már nincs claim-elő worker
+        with self._write() as conn:
+            self._recycle_expired(conn, time.time())
+            rows = conn.execute(
+                "SELECT key, result FROM tasks WHERE batch = ? AND status = 'done' ORDER BY rowid LIMIT ?",
+                (batch, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET status = 'collected' WHERE batch = ? AND key = ?",
+                [(batch, key) for key, _ in rows],
+            )
+        return [(key, json.loads(result)) for key, result in rows]
+
+    def counts(self, batch):
+        with self._write() as conn:
+            self._recycle_expired(conn, time.time())
+            return dict(conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE batch = ? GROUP BY status", (batch,)
+            ).fetchall())
+
+    def failed(self, batch):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT key, error FROM tasks WHERE batch = ? AND status = 'failed' ORDER BY rowid", (batch,)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+# ----------------------------------------------------------------------------
+# TCP kiszolgálás (multiprocessing manager): a koordinátor a saját sorát
+# teszi elérhetővé, a workerek proxyn keresztül ugyanazokat a metódusokat hívják.
+# ----------------------------------------------------------------------------
+class _ServerManager(BaseManager):
+    pass
+
+
+class _ClientManager(BaseManager):
+    pass
+
+
+QUEUE_METHODS = ("enqueue", "claim", "extend", "complete", "fail", "collect", "counts", "failed")
+
+
+class QueueProxy(MakeProxyType("_QueueProxyBase", QUEUE_METHODS)):
+    """A távoli sor; a close() csak a kapcsolatot engedi el, a sort nem zárja le."""
+
+    def close(self):
+        pass
+
+
+_ClientManager.register("work_queue", proxytype=QueueProxy)
+
+
+def serve_queue(work_queue, address, authkey):
+    """A sor kiszolgálása háttérszálon a megadott (host, port) címen (authkey kötelező)."""
+    if not authkey:
+        raise ValueError("A munkasor csak authkey-jel szolgálható ki (SCRAPE_QUEUE_KEY)")
+    _ServerManager.register("work_queue", callable=lambda: work_queue, exposed=QUEUE_METHODS)
+    server = _ServerManager(address=address, authkey=authkey).get_server()
+    threading.Thread(target=server.serve_forever, name="work-queue-server", daemon=True).start()
+    print(f"Munkasor kiszolgálva: tcp://{address[0]}:{address[1]}")
+    return server
+
+
+def connect_queue(address, authkey):
+    if not authkey:
+        raise ValueError("A távoli munkasorhoz authkey kell (SCRAPE_QUEUE_KEY)")
+    manager = _ClientManager(address=address, authkey=authkey)
+    manager.connect()
+    return manager.work_queue()
+
+
+def open_queue(url, authkey=None):
+    """sqlite:///<fájl> vagy tcp://<host>:<port>."""
+    if url.startswith("sqlite:///"):
+        return SqliteWorkQueue(url[len("sqlite:///"):])
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].rpartition(":")
+        return connect_queue((host, int(port)), authkey)
+    raise ValueError(f"Ismeretlen munkasor URL: {url}")
+
+
+class LeaseKeeper:
+    """Háttérszál, amely lease/3 időnként meghosszabbítja a worker bérleteit."""
+
+    def __init__(self, work_queue, worker, lease=LEASE_SECONDS):
+        self.work_queue = work_queue
+        self.worker = worker
+        self.lease = lease
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.lease / 3):
+            try:
+                self.work_queue.extend(self.worker, self.lease)
+            except Exception as e:
+                print("Bérlet hosszabbítás sikertelen:", e)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()